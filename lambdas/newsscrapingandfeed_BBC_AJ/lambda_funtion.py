@@ -11,17 +11,62 @@ import threading
 import os
 
 from unbiasedupdates.utils import (
-    lg_runnable, gemini_runnable, get_article_content_and_images_bbc, parse_rss_feed_bbc,
-    get_aws_resources, process_articles_parallel_bbc, print_final_summary,
-    parse_aljazeera_news_sitemap, process_articles_parallel_aj
+    lg_runnable, gemini_runnable, process_articles_parallel_bbc, print_final_summary,
+    process_articles_parallel_aj, process_articles_all_sources,
+    iter_rss_feed_bbc, iter_aljazeera_news_sitemap
 )
 from unbiasedupdates.prompts import SUMMARY_GEN_SYS_TEMP
+from unbiasedupdates.sessions import configure_http_sessions
+from unbiasedupdates.feeds import discover_articles
+from unbiasedupdates.ratelimit import configure_rate_limits, set_invocation_deadline
+from unbiasedupdates.async_processing import process_articles_async
+from unbiasedupdates.pipeline import process_articles_pipeline
+from unbiasedupdates.batch_processing import process_articles_batch
+from unbiasedupdates.concurrency import configure_llm_concurrency, llm_concurrency
+from unbiasedupdates.resilience import circuit_breakers
+from unbiasedupdates.extraction import selector_stats
+from unbiasedupdates.extraction_pool import configure_extraction_pool, get_extraction_pool
+from unbiasedupdates.llm_cache import LLM_CACHE_TABLE, build_llm_cache, configure_llm_cache, get_llm_cache
+from unbiasedupdates.near_duplicates import (
+    NearDuplicateIndex, backfill_near_duplicate_index, configure_near_duplicates
+)
+from unbiasedupdates.storage import BatchItemWriter, backfill_url_index, filter_new_articles
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 
 # Constants and Setup
 DAYS_BACK = 10
 model = 'openai'
+# 'threads' (sliding window of workers), 'async' (coroutines under one semaphore),
+# 'pipeline' (fetch -> extract -> summarize -> persist stages) or 'batch'
+# (threaded fetch, LLM calls kept in flight on one async executor)
+PROCESSING_MODE = os.environ.get('PROCESSING_MODE', 'threads')
+# LLM calls in flight per provider: starts at the initial value and adapts up to
+# the maximum (AIMD), backing off on 429/503s and latency spikes
+LLM_INITIAL_IN_FLIGHT = int(os.environ.get('LLM_INITIAL_IN_FLIGHT', '5'))
+LLM_MAX_IN_FLIGHT = int(os.environ.get('LLM_MAX_IN_FLIGHT', '32'))
+# Articles in flight across all sources, and each source's share of them
+MAX_WORKERS = 10
+SOURCE_WEIGHTS = {'BBC': 1, 'AJ': 1}
+ASYNC_MAX_CONCURRENCY = 50
+ASYNC_IO_WORKERS = 32
+PIPELINE_WORKERS = {
+    'fetch_workers': 8,
+    'extract_workers': 2,
+    # Enough threads for the adaptive limit to reach its maximum
+    'llm_workers': LLM_MAX_IN_FLIGHT,
+    'persist_workers': 2,
+    'queue_size': 10,
+}
+BATCH_FETCH_WORKERS = 8
+# Threads fetching article pages concurrently in each mode (LLM calls go through
+# the providers' own clients, not the pooled sessions)
+HTTP_WORKERS = {
+    'threads': MAX_WORKERS,
+    'async': ASYNC_IO_WORKERS,
+    'pipeline': PIPELINE_WORKERS['fetch_workers'],
+    'batch': BATCH_FETCH_WORKERS,
+}
 
 import boto3
 import json
@@ -50,12 +95,48 @@ OPENAI_API_KEY = secrets["OPENAI_API_KEY"]
 GOOGLE_API_KEY = secrets["GOOGLE_API_KEY"]
 
 llm_g_2_5 = ChatGoogleGenerativeAI(model="gemini-2.5-pro", google_api_key=GOOGLE_API_KEY)
-llm_g_2_5_f = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=GOOGLE_API_KEY)
-llm_4o = ChatOpenAI(model="gpt-4o", api_key=OPENAI_API_KEY)
+# Client-side retries are off: invoke_with_failover retries with backoff, trips
+# the per-provider circuit breakers and fails over between these two models
+llm_g_2_5_f = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=GOOGLE_API_KEY, max_retries=0)
+llm_4o = ChatOpenAI(model="gpt-4o", api_key=OPENAI_API_KEY, max_retries=0)
 
 runnable = lg_runnable(llm=llm_4o, system_message=SUMMARY_GEN_SYS_TEMP)
 grunnable = gemini_runnable(llm_g_2_5_f, template=SUMMARY_GEN_SYS_TEMP)
 
+# Parse article HTML in worker processes when the Lambda has more than one vCPU,
+# so parsing doesn't contend for the GIL with the network threads.
+# EXTRACTION_PROCESSES: 'auto' (one per vCPU), a process count, or 0 to parse in-thread.
+EXTRACTION_PROCESSES = os.environ.get('EXTRACTION_PROCESSES', 'auto')
+if EXTRACTION_PROCESSES != '0':
+    configure_extraction_pool(workers=None if EXTRACTION_PROCESSES == 'auto' else int(EXTRACTION_PROCESSES))
+
+# Raw LLM outputs keyed by (content, prompt, model), looked up before every call:
+# in memory, then /tmp (both survive warm starts), then a DynamoDB table shared
+# by all containers. Entries expire after LLM_CACHE_TTL seconds (default 7 days).
+configure_llm_cache(build_llm_cache(table_name=LLM_CACHE_TABLE))
+
+# SimHash fingerprints of summarized articles. A story within
+# NEAR_DUPLICATE_MAX_DISTANCE bits (default 3 of 64) of a stored one, e.g. the
+# same agency copy on both sites, reuses that summary instead of calling the LLM.
+configure_near_duplicates(NearDuplicateIndex())
+
+# Requests per second and burst, shared by all workers. Hosts and providers
+# also pause themselves on 429s for as long as Retry-After asks, up to
+# MAX_RETRY_AFTER_SECONDS (default 60) and never past the invocation's end;
+# a longer Retry-After fails the request (or fails over to the other model).
+configure_rate_limits({
+    'bbc.co.uk': (5.0, 10),
+    'aljazeera.com': (3.0, 5),
+    'openai': (2.0, 5),
+    'gemini': (2.0, 5),
+})
+
+# Adaptive limit on LLM calls in flight per provider, shared by every engine
+configure_llm_concurrency({
+    'openai': (LLM_INITIAL_IN_FLIGHT, LLM_MAX_IN_FLIGHT),
+    'gemini': (LLM_INITIAL_IN_FLIGHT, LLM_MAX_IN_FLIGHT),
+})
+
 # Headers to mimic a real browser request
 headers_bbc = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -66,8 +147,6 @@ headers_aj = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
     'Accept-Language': 'en-US,en;q=0.5',
-    'Accept-Encoding': 'gzip, deflate',
-    'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1',
 }
 
@@ -83,46 +162,141 @@ rss_urls_bbc = [
     "http://newsrss.bbc.co.uk/rss/newsonline_uk_edition/world/rss.xml"
 ]
 
-def lambda_handler(event, context):
-    all_articles_bbc = []
-
-    for url in rss_urls_bbc:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            articles = parse_rss_feed_bbc(response.content, days_back=DAYS_BACK)
-            all_articles_bbc.extend(articles)
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-
-    results_bbc = process_articles_parallel_bbc(
-        articles=all_articles_bbc,
+source_headers = {'BBC': headers_bbc, 'AJ': headers_aj}
+
+aljazeera_sitemap_url = "https://www.aljazeera.com/news-sitemap.xml"
+
+# Every feed is fetched in parallel during discovery.
+# stop_at_cutoff is deliberately left off: BBC RSS items are in editorial order,
+# not date order, so stopping at the first old item would drop newer ones after
+# it; the Al Jazeera news sitemap only lists the last couple of days, so a
+# DAYS_BACK cutoff is never reached and stopping early would save nothing.
+feeds = [
+    # BBC feeds overlap heavily; each item is tagged with its feed's section
+    # (e.g. 'world') and duplicates are merged with the union of their tags.
+    {'source': 'BBC', 'url': url, 'stream_parser': iter_rss_feed_bbc, 'timeout': 10,
+     'category': url.rstrip('/').split('/')[-2]}
+    for url in rss_urls_bbc
+] + [
+    {'source': 'AJ', 'url': aljazeera_sitemap_url, 'stream_parser': iter_aljazeera_news_sitemap,
+     'timeout': 10},
+]
+
+# One kept-alive connection per worker per host: the selected engine's fetch
+# threads, or the BBC feeds all fetched at once during discovery, whichever is
+# more. Accept-Encoding and Connection headers are set by the pooled sessions.
+configure_http_sessions(pool_size=max(HTTP_WORKERS.get(PROCESSING_MODE, MAX_WORKERS), len(rss_urls_bbc)))
+
+def process_articles(articles, source, headers, writer=None):
+    """Run one source's articles through the engine selected by PROCESSING_MODE"""
+    if PROCESSING_MODE == 'async':
+        return process_articles_async(
+            articles=articles,
+            source=source,
+            model=model,
+            headers=headers,
+            runnable=runnable,
+            grunnable=grunnable,
+            max_concurrency=ASYNC_MAX_CONCURRENCY,
+            io_workers=ASYNC_IO_WORKERS,
+            writer=writer
+        )
+
+    if PROCESSING_MODE == 'pipeline':
+        return process_articles_pipeline(
+            articles=articles,
+            source=source,
+            model=model,
+            headers=headers,
+            runnable=runnable,
+            grunnable=grunnable,
+            writer=writer,
+            **PIPELINE_WORKERS
+        )
+
+    if PROCESSING_MODE == 'batch':
+        return process_articles_batch(
+            articles=articles,
+            source=source,
+            model=model,
+            headers=headers,
+            runnable=runnable,
+            grunnable=grunnable,
+            fetch_workers=BATCH_FETCH_WORKERS,
+            writer=writer
+        )
+
+    process_articles_parallel = process_articles_parallel_bbc if source == 'BBC' else process_articles_parallel_aj
+    return process_articles_parallel(
+        articles=articles,
         batch_size=100,
         model=model,
-        headers=headers_bbc,
+        headers=headers,
         runnable=runnable,
         grunnable=grunnable,
-        max_workers=5,
-        delay_between_batches=2.0
+        max_workers=MAX_WORKERS,
+        writer=writer
     )
 
-    print_final_summary(results_bbc)
-
-    try:
-        response = requests.get("https://www.aljazeera.com/news-sitemap.xml")
-        aljazeera_articles = parse_aljazeera_news_sitemap(response.content, days_back=DAYS_BACK)
-
-        results_aj = process_articles_parallel_aj(
-            articles=aljazeera_articles,
-            batch_size=100,
+def process_all_sources(articles_by_source, writer=None):
+    """
+    Process every source's articles. In 'threads' mode all sources share one
+    worker budget and are interleaved by SOURCE_WEIGHTS; the other engines run
+    the sources one after another.
+    """
+    if PROCESSING_MODE == 'threads':
+        return process_articles_all_sources(
+            articles_by_source=articles_by_source,
             model=model,
-            headers=headers_aj,
+            headers_by_source=source_headers,
             runnable=runnable,
             grunnable=grunnable,
-            max_workers=5,
-            delay_between_batches=2.0
+            max_workers=MAX_WORKERS,
+            weights=SOURCE_WEIGHTS,
+            writer=writer
         )
 
-        print_final_summary(results_aj)
-    except Exception as e:
-        print(f"Error processing Al Jazeera: {e}")
\ No newline at end of file
+    return {
+        source: process_articles(articles, source, source_headers[source], writer)
+        for source, articles in articles_by_source.items()
+    }
+
+def lambda_handler(event, context):
+    # One-off migration: {"action": "backfill_url_index"} copies stored article
+    # URLs from news_articles into the URL index instead of running the scrape.
+    if isinstance(event, dict) and event.get('action') == 'backfill_url_index':
+        return {'backfilled': backfill_url_index()}
+    # {"action": "backfill_near_duplicates"} fingerprints the already stored articles
+    if isinstance(event, dict) and event.get('action') == 'backfill_near_duplicates':
+        return {'indexed': backfill_near_duplicate_index()}
+
+    # No Retry-After pause may outlast the invocation
+    set_invocation_deadline(context.get_remaining_time_in_millis() / 1000)
+
+    articles_by_source = discover_articles(feeds, days_back=DAYS_BACK, total_timeout=60)
+
+    # Summarized articles are written in BatchWriteItem groups of 25; a timer
+    # flushes the buffer once the Lambda is within 30 s of its timeout, and every
+    # write after that goes out immediately.
+    with BatchItemWriter(context=context, deadline_margin_ms=30000) as writer:
+        # Resolve already-stored articles in bulk before scheduling any worker
+        new_articles_by_source, results_by_source = {}, {}
+        for source, articles in articles_by_source.items():
+            new_articles_by_source[source], results_by_source[source] = filter_new_articles(articles)
+
+        processed_by_source = process_all_sources(new_articles_by_source, writer)
+        writer.flush()
+
+    for source, results in results_by_source.items():
+        results.extend(processed_by_source.get(source, []))
+        print(f"\n{source}")
+        print_final_summary(results)
+
+    # Winning selector counts per source (kept across warm invocations); a new
+    # winner for a field usually means the site changed its layout
+    print(f"\nSelector stats: {json.dumps(selector_stats())}")
+    print(f"LLM cache: {json.dumps(get_llm_cache().stats())}")
+    print(f"LLM concurrency: {json.dumps(llm_concurrency.snapshot())}")
+    print(f"LLM circuit breakers: {json.dumps(circuit_breakers.snapshot())}")
+    if get_extraction_pool() is not None:
+        print(f"Selector stats (extraction processes): {json.dumps(get_extraction_pool().selector_stats())}")
\ No newline at end of file
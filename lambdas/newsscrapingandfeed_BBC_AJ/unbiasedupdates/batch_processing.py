@@ -0,0 +1,126 @@
+"""Batch ingestion engine: threaded fetch/extract with every LLM call kept in flight on one async executor."""
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from unbiasedupdates.llm import get_llm_executor, llm_candidates
+from unbiasedupdates.scheduler import run_sliding_window
+from unbiasedupdates.storage import BatchItemWriter
+from unbiasedupdates.utils import (
+    ARTICLE_SOURCES, _article_thumbnail, _check_content, _check_existing_title, _check_url_index,
+    _store_summary, print_result_progress
+)
+
+
+def process_articles_batch(articles: List[Dict[str, Any]],
+                           source: str,
+                           model: str,
+                           headers: Dict[str, str],
+                           runnable=None,
+                           grunnable=None,
+                           fetch_workers: int = 8,
+                           writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
+    """
+    Process articles with their LLM calls batched onto the shared async executor
+
+    Fetching, extraction and the pre-LLM checks run in `fetch_workers` threads.
+    Each article's LLM call is submitted as soon as it is ready, so calls overlap
+    with each other and with the remaining fetches; how many are actually in
+    flight is set per provider with `configure_llm_concurrency`. Results are
+    then parsed and saved in article order. Calls are retried and fail over to
+    the other model (see `invoke_with_failover`); one that still fails only
+    fails its own article.
+
+    Args:
+        articles: List of article dictionaries
+        source: Key into ARTICLE_SOURCES ('BBC' or 'AJ')
+        model: Model to use ('openai' or 'gemini')
+        headers: Headers for web requests
+        runnable: OpenAI runnable instance (required if model='openai')
+        grunnable: Gemini runnable instance (required if model='gemini')
+        fetch_workers: Threads downloading and extracting article pages
+        writer: Optional write-behind buffer for the DynamoDB writes (flushed by the caller)
+
+    Returns:
+        List of processing results, in the same order as `articles`
+    """
+    if model == 'openai' and runnable is None:
+        raise ValueError("runnable is required when model='openai'")
+    if model == 'gemini' and grunnable is None:
+        raise ValueError("grunnable is required when model='gemini'")
+    if model not in ('openai', 'gemini'):
+        raise ValueError(f"Unsupported model: {model}")
+    if source not in ARTICLE_SOURCES:
+        raise ValueError(f"Unknown source: {source}")
+
+    source_config = ARTICLE_SOURCES[source]
+    candidates = llm_candidates(model, runnable, grunnable)
+    llms = dict(candidates)
+    executor = get_llm_executor()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(articles)
+    # index -> (job, future) for articles waiting on the LLM
+    pending: Dict[int, tuple] = {}
+    pending_lock = threading.Lock()
+
+    def finish(index, result):
+        results[index] = result
+        print_result_progress(result)
+
+    # 1. Everything up to the LLM call: index check, fetch, extract, quality gate,
+    #    title check and near-duplicate reuse
+    def prepare(job):
+        article, url = job['article'], job['url']
+        skipped = _check_url_index(article)
+        if skipped:
+            return skipped
+
+        title, content, main_image_url, _ = source_config['extractor'](url, headers)
+        job['title'] = title
+        job['content'] = content
+        rejection = _check_content(article, source, title, content)
+        if rejection:
+            return rejection
+
+        job['thumbnail'] = _article_thumbnail(article, source, main_image_url)
+        done = _check_existing_title(article, source, title, content, job['thumbnail'], writer)
+        if done:
+            return done
+
+        # 2. Hand the LLM call (with retries and failover) to the executor and move on
+        future = executor.submit_with_failover(candidates, {'content': content})
+        with pending_lock:
+            pending[job['index']] = (job, future)
+        return None
+
+    def on_result(job, result):
+        if result is not None:
+            finish(job['index'], result)
+
+    def on_error(job, e):
+        finish(job['index'], {
+            'status': 'error',
+            'title': job.get('title') or job['article'].get('title', 'Unknown'),
+            'url': job['url'],
+            'message': str(e)
+        })
+
+    # 3. Validate each LLM output and write the item
+    def persist(job: Dict[str, Any], future: Future) -> Dict[str, Any]:
+        llm_output, model_used = future.result()
+        return _store_summary(job['article'], source, job['title'], job['content'], job['thumbnail'],
+                              llm_output, model_used, llms[model_used], writer)
+
+    print(f"Processing {len(articles)} articles in batch mode (fetch={fetch_workers})")
+
+    jobs = ({'index': index, 'article': article, 'url': article['link']}
+            for index, article in enumerate(articles))
+    run_sliding_window(jobs, prepare, fetch_workers, on_result=on_result, on_error=on_error)
+
+    for index in sorted(pending):
+        job, future = pending[index]
+        try:
+            finish(index, persist(job, future))
+        except Exception as e:
+            on_error(job, e)
+
+    return results
@@ -0,0 +1,183 @@
+"""Adaptive (AIMD) per-provider limits on LLM calls in flight, shared by threads and coroutines."""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+# (initial, maximum) concurrent calls per LLM provider. The limit starts at the
+# initial value and adapts between 1 and the maximum.
+DEFAULT_LLM_CONCURRENCY: Dict[str, Tuple[int, int]] = {
+    'openai': (5, 32),
+    'gemini': (5, 32),
+}
+
+
+class ConcurrencyLimiter:
+    """
+    Counting limiter usable from threads (`acquire`) and coroutines (`acquire_async`).
+
+    Unlike asyncio.Semaphore it is not bound to one event loop, so the threaded
+    engines, the async engine and the LLM executor all share the same slots.
+
+    The limit adapts AIMD-style, like a TCP congestion window: every successful
+    call made while the limit was fully used adds 1/limit (so about +1 per
+    limit's worth of calls), and an overload signal (a 429/503, or a latency
+    above `latency_factor` times the running average) multiplies it by
+    `backoff`. Signals from calls started before the last decrease are ignored,
+    so one burst of 429s cuts the limit once rather than once per call. With
+    `max_limit` equal to `limit` the limit is fixed.
+    """
+
+    # How often a waiting coroutine re-checks for a free slot; LLM calls take
+    # seconds, so this adds no meaningful latency
+    _ASYNC_POLL = 0.05
+    # Weight of each new sample in the running latency average
+    _LATENCY_ALPHA = 0.1
+
+    def __init__(self, limit: int, max_limit: Optional[int] = None, min_limit: int = 1,
+                 backoff: float = 0.5, latency_factor: float = 3.0, latency_samples: int = 10):
+        """
+        Args:
+            limit: Initial number of calls allowed in flight
+            max_limit: Ceiling for additive increase (None fixes the limit at `limit`)
+            min_limit: Floor for multiplicative decrease
+            backoff: Factor applied to the limit on overload
+            latency_factor: A call this many times slower than average counts as overload
+            latency_samples: Successful calls needed before latency spikes are detected
+        """
+        max_limit = limit if max_limit is None else max_limit
+        if not 1 <= min_limit <= limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.latency_samples = latency_samples
+        self.in_flight = 0
+        self.decreases = 0
+        self.latency_average: Optional[float] = None
+        self._limit = float(limit)
+        self._samples = 0
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight"""
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free"""
+        with self._condition:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a slot is free and take it"""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """Coroutine version of `acquire` (waits without blocking the event loop)"""
+        while not self.try_acquire():
+            await asyncio.sleep(self._ASYNC_POLL)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def record_success(self, started: float):
+        """
+        Report a call that succeeded (call before `release`).
+
+        Args:
+            started: time.monotonic() when the call was sent
+        """
+        latency = time.monotonic() - started
+        with self._condition:
+            average = self.latency_average
+            spike = self._samples >= self.latency_samples and latency > self.latency_factor * average
+            self._samples += 1
+            if average is None:
+                self.latency_average = latency
+            else:
+                self.latency_average += self._LATENCY_ALPHA * (latency - average)
+
+            if spike:
+                self._decrease(started, f"latency {latency:.1f}s (average {average:.1f}s)")
+            elif self.in_flight >= self.limit and self._limit < self.max_limit:
+                # Only grow while the current limit is actually the bottleneck
+                previous = self.limit
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                if self.limit > previous:
+                    self._condition.notify_all()
+
+    def record_overload(self, started: float):
+        """
+        Report a call rejected for overload, e.g. a 429 or 503 (call before `release`).
+
+        Args:
+            started: time.monotonic() when the call was sent
+        """
+        with self._condition:
+            self._decrease(started, "provider overloaded")
+
+    def _decrease(self, started: float, reason: str):
+        if started <= self._last_decrease or self._limit <= self.min_limit:
+            return
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        if self.limit != previous:
+            print(f"Concurrency limit {previous} -> {self.limit}: {reason}")
+
+
+class ConcurrencyRegistry:
+    """Named limiters; keys without a configured limiter are not limited."""
+
+    def __init__(self, limits: Optional[Dict[str, Union[int, Tuple[int, int]]]] = None):
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+        for key, limit in (limits or {}).items():
+            self.configure(key, limit)
+
+    def configure(self, key: str, limit: Union[int, Tuple[int, int]]):
+        """Set `key` to a fixed limit (int) or an adaptive (initial, maximum) pair"""
+        initial, maximum = limit if isinstance(limit, tuple) else (limit, limit)
+        self._limiters[key] = ConcurrencyLimiter(initial, max_limit=maximum)
+
+    def get(self, key: str) -> Optional[ConcurrencyLimiter]:
+        return self._limiters.get(key)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, calls in flight, decreases so far and average latency per key"""
+        return {key: {'limit': limiter.limit,
+                      'max_limit': limiter.max_limit,
+                      'in_flight': limiter.in_flight,
+                      'decreases': limiter.decreases,
+                      'latency_average': round(limiter.latency_average, 2)
+                      if limiter.latency_average is not None else None}
+                for key, limiter in self._limiters.items()}
+
+
+# Shared by every engine in the process
+llm_concurrency = ConcurrencyRegistry(DEFAULT_LLM_CONCURRENCY)
+
+
+def configure_llm_concurrency(limits: Dict[str, Union[int, Tuple[int, int]]]):
+    """
+    Set the calls allowed in flight for the given providers (others keep their limits).
+
+    Args:
+        limits: Mapping of provider ('openai', 'gemini') -> fixed limit, or
+            (initial, maximum) for a limit that adapts to 429s and latency
+    """
+    for key, limit in limits.items():
+        llm_concurrency.configure(key, limit)
@@ -0,0 +1,397 @@
+"""Single-pass selector engine: evaluates every candidate selector of an extraction plan in one tree walk."""
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from bs4 import SoupStrainer, Tag
+
+from unbiasedupdates.html_backends import parse_html, resolve_backend
+
+# One compound selector, e.g. `h1.title[id="x"]`: (tag or None, id or None, classes, attribute conditions)
+Compound = Tuple[Optional[str], Optional[str], frozenset, Tuple[Tuple[str, Optional[str], Optional[str]], ...]]
+
+_TOKEN_RE = re.compile(r'''
+    (?P<tag>[a-zA-Z][\w-]*|\*)
+  | \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[*^$~]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+''', re.X)
+
+
+def compile_selector(selector: str) -> List[Compound]:
+    """
+    Compile a CSS selector into its compound parts, outermost first.
+
+    Supports the subset the extractors use: type, `*`, `.class`, `#id`,
+    `[attr]`, `[attr=v]`, `[attr*=v]`, `[attr^=v]`, `[attr$=v]`, `[attr~=v]`
+    and the descendant combinator (whitespace). Anything else raises ValueError.
+    """
+    compounds = []
+    for part in selector.split():
+        tag = id_ = None
+        classes = set()
+        conditions = []
+        pos = 0
+        while pos < len(part):
+            match = _TOKEN_RE.match(part, pos)
+            if match is None or (match.group('tag') and pos):
+                raise ValueError(f"Unsupported selector: {selector!r}")
+            if match.group('tag'):
+                tag = None if match.group('tag') == '*' else match.group('tag').lower()
+            elif match.group('cls'):
+                classes.add(match.group('cls'))
+            elif match.group('id'):
+                id_ = match.group('id')
+            else:
+                value = next((v for v in match.group('dq', 'sq', 'bare') if v is not None), None)
+                conditions.append((match.group('attr').lower(), match.group('op'), value))
+            pos = match.end()
+        compounds.append((tag, id_, frozenset(classes), tuple(conditions)))
+    if not compounds:
+        raise ValueError(f"Empty selector: {selector!r}")
+    return compounds
+
+
+def _attr_text(attrs: Dict[str, Any], name: str) -> Optional[str]:
+    value = attrs.get(name)
+    # BeautifulSoup stores multi-valued attributes (class, rel, ...) as lists
+    if isinstance(value, list):
+        return ' '.join(value)
+    return value
+
+
+def _matches(tag: Tag, compound: Compound) -> bool:
+    name, id_, classes, conditions = compound
+    if name is not None and tag.name != name:
+        return False
+    attrs = tag.attrs
+    if id_ is not None and attrs.get('id') != id_:
+        return False
+    if classes and not classes.issubset(attrs.get('class') or ()):
+        return False
+    for attr, op, expected in conditions:
+        value = _attr_text(attrs, attr)
+        if value is None:
+            return False
+        if op is None:
+            continue
+        if op == '=':
+            if value != expected:
+                return False
+        elif op == '~=':
+            if expected not in value.split():
+                return False
+        # Substring operators never match an empty value (as in soupsieve)
+        elif not expected:
+            return False
+        elif op == '*=':
+            if expected not in value:
+                return False
+        elif op == '^=':
+            if not value.startswith(expected):
+                return False
+        elif not value.endswith(expected):
+            return False
+    return True
+
+
+def _matches_ancestors(ancestors: List[Tag], compounds: List[Compound]) -> bool:
+    # Descendant combinators only, so matching the innermost ancestor first is enough
+    remaining = len(compounds) - 1
+    for ancestor in reversed(ancestors):
+        if remaining < 0:
+            break
+        if _matches(ancestor, compounds[remaining]):
+            remaining -= 1
+    return remaining < 0
+
+
+def _walk(root: Tag) -> Iterator[Tuple[Tag, List[Tag]]]:
+    """Yield (element, ancestors) for every element below `root` in document order"""
+    ancestors: List[Tag] = []
+    iterators = [iter(root.contents)]
+    while iterators:
+        for child in iterators[-1]:
+            if isinstance(child, Tag):
+                yield child, ancestors
+                ancestors.append(child)
+                iterators.append(iter(child.contents))
+                break
+        else:
+            iterators.pop()
+            if ancestors:
+                ancestors.pop()
+
+
+# Named plans, for selector_stats()
+_PLANS: Dict[str, 'ExtractionPlan'] = {}
+
+
+class ExtractionPlan:
+    """
+    A compiled set of fields, each with selectors in priority order.
+
+    Each field is a dict with:
+    - 'selectors': CSS selectors, highest priority first
+    - 'value': callable turning the match into the field value
+    - 'many' (optional): if True the field takes every match of the first selector
+      that matches anything (like `select`), and 'value' gets the list of elements.
+      Otherwise only the first match of each selector is considered (like
+      `select_one`), and 'value' may return None to fall through to the next selector.
+
+    On a BeautifulSoup tree the whole plan is evaluated in a single walk instead of
+    one traversal per selector. Other documents (selectolax) are evaluated selector
+    by selector with their native CSS engine.
+
+    The plan counts which selector wins each field. Once a selector has won at
+    least `adapt_after` pages and more than any other, the selectors ranked
+    below it are no longer evaluated: the usual winner and everything above it
+    still run in priority order, so a higher-priority match always wins. A page
+    where none of those produce a value is re-evaluated with the full list, so
+    pruning never changes what is extracted. Counts live for the life of the
+    process (i.e. across warm Lambda invocations); a change of winner is
+    logged, as it usually means the site's layout changed.
+
+    `extract` parses only the plan's `regions` (tag names, e.g. 'main') on the
+    BeautifulSoup backends, skipping navigation, scripts and footers, and falls
+    back to a full parse unless every field was found by its first selector.
+    """
+
+    def __init__(self, fields: Dict[str, Dict[str, Any]], name: Optional[str] = None,
+                 adaptive: bool = True, adapt_after: int = 3,
+                 regions: Optional[Sequence[str]] = None):
+        self.fields = fields
+        self.name = name
+        self.regions = list(regions) if regions else None
+        self.adaptive = adaptive
+        self.adapt_after = adapt_after
+        self._compiled = {
+            field_name: [compile_selector(selector) for selector in field['selectors']]
+            for field_name, field in fields.items()
+        }
+        self._lock = threading.Lock()
+        self._wins = {field_name: [0] * len(field['selectors']) for field_name, field in fields.items()}
+        self._misses = {field_name: 0 for field_name in fields}
+        self._fallbacks = {field_name: 0 for field_name in fields}
+        self._pages = 0
+        self._restricted_parses = 0
+        self._full_parses = 0
+        # Selectors evaluated per field (indices into 'selectors', always in priority
+        # order), plus the walk index built from them. The active layout may be
+        # pruned to the usual winner; the full layout is the fallback.
+        self._full_layout = self._build_layout({field_name: list(range(len(field['selectors'])))
+                                                for field_name, field in fields.items()})
+        self._layout = self._full_layout
+        if name is not None:
+            _PLANS[name] = self
+
+    def _build_layout(self, order: Dict[str, List[int]]):
+        # Candidates indexed by the tag their rightmost compound requires
+        by_tag: Dict[str, List[Tuple[str, int, List[Compound]]]] = {}
+        any_tag: List[Tuple[str, int, List[Compound]]] = []
+        for field_name, indices in order.items():
+            for rank, index in enumerate(indices):
+                compounds = self._compiled[field_name][index]
+                tag = compounds[-1][0]
+                bucket = any_tag if tag is None else by_tag.setdefault(tag, [])
+                bucket.append((field_name, rank, compounds))
+        return order, by_tag, any_tag
+
+    def run(self, doc: Any) -> Dict[str, Any]:
+        """
+        Extract every field from a parsed document.
+
+        Returns:
+            Mapping of field name -> value (None where no selector produced one)
+        """
+        hits, fell_back = self._evaluate_pruned(doc)
+        self._record(hits, fell_back)
+        return {field_name: value for field_name, (_, value) in hits.items()}
+
+    def extract(self, html: Union[bytes, str], backend: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse a page and extract every field.
+
+        Only the plan's regions are parsed when the backend supports it; if any
+        field is missing there or only matched a lower-ranked selector, the
+        whole page is parsed instead.
+
+        Args:
+            html: Raw page bytes or text
+            backend: HTML parser backend (see html_backends)
+
+        Returns:
+            Mapping of field name -> value (None where no selector produced one)
+        """
+        backend = resolve_backend(backend)
+        # selectolax parses the full page faster than BeautifulSoup parses a region
+        if self.regions and backend != 'selectolax':
+            doc = parse_html(html, backend, parse_only=SoupStrainer(self.regions))
+            hits, fell_back = self._evaluate_pruned(doc)
+            # Trust the regions only when every field came from its first selector:
+            # a miss, or a lower-ranked match, may mean the better match sits
+            # outside them (e.g. a featured image above <main>)
+            if all(index == 0 for index, _ in hits.values()):
+                with self._lock:
+                    self._restricted_parses += 1
+                self._record(hits, fell_back)
+                return {field_name: value for field_name, (_, value) in hits.items()}
+
+        with self._lock:
+            self._full_parses += 1
+        return self.run(parse_html(html, backend))
+
+    def _evaluate(self, doc: Any, layout) -> Dict[str, Tuple[Optional[int], Any]]:
+        if isinstance(doc, Tag):
+            return self._run_single_pass(doc, layout)
+        return self._run_cascade(doc, layout)
+
+    def _evaluate_pruned(self, doc: Any) -> Tuple[Dict[str, Tuple[Optional[int], Any]], List[str]]:
+        """
+        Evaluate the active (possibly pruned) layout, re-evaluating fields it
+        missed with every selector.
+
+        Returns:
+            (hits, names of the fields that needed the full list)
+        """
+        layout = self._layout
+        hits = self._evaluate(doc, layout)
+        fell_back = [field_name for field_name, (index, _) in hits.items()
+                     if index is None and len(layout[0][field_name]) < len(self.fields[field_name]['selectors'])]
+        if fell_back:
+            full_hits = self._evaluate(doc, self._full_layout)
+            for field_name in fell_back:
+                hits[field_name] = full_hits[field_name]
+        return hits, fell_back
+
+    def _record(self, hits: Dict[str, Tuple[Optional[int], Any]], fell_back: List[str]):
+        changed = []
+        with self._lock:
+            self._pages += 1
+            for field_name, (index, _) in hits.items():
+                if field_name in fell_back:
+                    self._fallbacks[field_name] += 1
+                if index is None:
+                    self._misses[field_name] += 1
+                    continue
+                wins = self._wins[field_name]
+                wins[index] += 1
+                if not self.adaptive:
+                    continue
+                # Usual winner: most wins, ties going to the higher-priority selector
+                winner = max(range(len(wins)), key=lambda i: (wins[i], -i))
+                active = len(wins) if wins[winner] < self.adapt_after else winner + 1
+                if active != len(self._layout[0][field_name]):
+                    changed.append((field_name, active))
+
+            if changed:
+                order = {field_name: list(indices) for field_name, indices in self._layout[0].items()}
+                for field_name, active in changed:
+                    order[field_name] = list(range(active))
+                self._layout = self._build_layout(order)
+
+        for field_name, active in changed:
+            selectors = self.fields[field_name]['selectors']
+            if active < len(selectors):
+                print(f"{self.name or 'Extraction'}: '{field_name}' usually won by '{selectors[active - 1]}'; "
+                      f"not evaluating the {len(selectors) - active} selectors ranked below it")
+            else:
+                print(f"{self.name or 'Extraction'}: '{field_name}' evaluating every selector again")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Selector win counts for inspection.
+
+        Returns:
+            {'pages': n, 'restricted_parses': n, 'full_parses': n,
+            'fields': {field: {'last_evaluated': lowest-priority selector still
+            evaluated, 'wins': {selector: count}, 'misses': pages with no hit,
+            'fallbacks': pages where the pruned selectors missed and the full
+            list was evaluated}}}
+        """
+        with self._lock:
+            order = self._layout[0]
+            return {
+                'pages': self._pages,
+                'restricted_parses': self._restricted_parses,
+                'full_parses': self._full_parses,
+                'fields': {
+                    field_name: {
+                        'last_evaluated': field['selectors'][order[field_name][-1]],
+                        'wins': {selector: count for selector, count
+                                 in zip(field['selectors'], self._wins[field_name]) if count},
+                        'misses': self._misses[field_name],
+                        'fallbacks': self._fallbacks[field_name],
+                    }
+                    for field_name, field in self.fields.items()
+                },
+            }
+
+    def _run_single_pass(self, doc: Tag, layout) -> Dict[str, Tuple[Optional[int], Any]]:
+        order, by_tag, any_tag = layout
+        fields = self.fields
+        # Selectors at or past cutoff[name] can no longer win their field
+        cutoff = {name: len(field['selectors']) for name, field in fields.items()}
+        first_done = set()
+        single_values: Dict[str, Dict[int, Any]] = {name: {} for name in fields}
+        many_matches: Dict[str, Dict[int, List[Tag]]] = {name: {} for name in fields}
+
+        for tag, ancestors in _walk(doc):
+            for bucket in (by_tag.get(tag.name), any_tag):
+                if not bucket:
+                    continue
+                for name, rank, compounds in bucket:
+                    if rank >= cutoff[name] or (name, rank) in first_done:
+                        continue
+                    if not _matches(tag, compounds[-1]):
+                        continue
+                    if len(compounds) > 1 and not _matches_ancestors(ancestors, compounds[:-1]):
+                        continue
+                    if fields[name].get('many'):
+                        many_matches[name].setdefault(rank, []).append(tag)
+                        cutoff[name] = rank + 1
+                    else:
+                        first_done.add((name, rank))
+                        value = fields[name]['value'](tag)
+                        if value is not None:
+                            single_values[name][rank] = value
+                            cutoff[name] = rank
+
+        hits = {}
+        for name, field in fields.items():
+            if field.get('many'):
+                matches = many_matches[name]
+                rank = min(matches) if matches else None
+                value = field['value'](matches[rank]) if matches else None
+            else:
+                values = single_values[name]
+                rank = min(values) if values else None
+                value = values[rank] if values else None
+            hits[name] = (order[name][rank] if rank is not None else None, value)
+        return hits
+
+    def _run_cascade(self, doc: Any, layout) -> Dict[str, Tuple[Optional[int], Any]]:
+        order = layout[0]
+        hits = {}
+        for name, field in self.fields.items():
+            hits[name] = (None, None)
+            for index in order[name]:
+                selector = field['selectors'][index]
+                if field.get('many'):
+                    elements = doc.select(selector)
+                    if elements:
+                        hits[name] = (index, field['value'](elements))
+                        break
+                else:
+                    element = doc.select_one(selector)
+                    if element is not None:
+                        value = field['value'](element)
+                        if value is not None:
+                            hits[name] = (index, value)
+                            break
+        return hits
+
+
+def selector_stats() -> Dict[str, Dict[str, Any]]:
+    """Selector win counts of every named plan (see ExtractionPlan.stats), keyed by plan name"""
+    return {name: plan.stats() for name, plan in _PLANS.items()}
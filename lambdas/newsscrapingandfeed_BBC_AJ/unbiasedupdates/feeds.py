@@ -0,0 +1,133 @@
+"""Feed discovery: fetch every configured RSS feed / sitemap concurrently and merge the results."""
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+from unbiasedupdates.sessions import http_get
+from unbiasedupdates.storage import article_key
+from unbiasedupdates.urls import url_key
+
+
+def iter_feed_articles(feed: Dict[str, Any], days_back: int) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a feed and yield its articles while the body is still downloading.
+
+    Uses the feed's 'stream_parser' (e.g. `iter_rss_feed_bbc`) over the raw,
+    decompressed response stream, so nothing but the current item is held in
+    memory and consumers can start on the first article right away.
+    """
+    with http_get(feed['url'], headers=feed.get('headers'), timeout=feed.get('timeout', 10),
+                  stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield from feed['stream_parser'](response.raw, days_back=days_back,
+                                         stop_at_cutoff=feed.get('stop_at_cutoff', False))
+
+
+def _fetch_feed(feed: Dict[str, Any], days_back: int) -> List[Dict[str, Any]]:
+    if feed.get('stream_parser'):
+        # Collected in full: merging overlapping feeds needs every item. Reading
+        # ends early only for feeds configured with 'stop_at_cutoff'.
+        articles = list(iter_feed_articles(feed, days_back))
+    else:
+        response = http_get(feed['url'], headers=feed.get('headers'), timeout=feed.get('timeout', 10))
+        response.raise_for_status()
+        articles = feed['parser'](response.content, days_back=days_back)
+
+    if feed.get('category'):
+        for article in articles:
+            article['categories'] = [feed['category']]
+    return articles
+
+
+def merge_feed_items(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse items that appear in several feeds into one article.
+
+    Items are the same story when they share a canonical URL or a feed GUID. The first
+    occurrence is kept (feed order) and its `categories` become the union of
+    every duplicate's categories, in first-seen order.
+
+    Returns:
+        The de-duplicated articles
+    """
+    merged: List[Dict[str, Any]] = []
+    by_key: Dict[str, Dict[str, Any]] = {}
+
+    for article in articles:
+        keys = [article_key(article)]
+        if article.get('guid'):
+            # BBC GUIDs are article URLs with a '#0'-style suffix; canonicalizing
+            # them lets a GUID match either another GUID or a link
+            keys.append(url_key(article['guid']) if '://' in article['guid'] else f"guid:{article['guid']}")
+
+        existing = next((by_key[key] for key in keys if key in by_key), None)
+        if existing is None:
+            existing = article
+            merged.append(article)
+        else:
+            categories = existing.setdefault('categories', [])
+            for category in article.get('categories', []):
+                if category not in categories:
+                    categories.append(category)
+
+        for key in keys:
+            by_key.setdefault(key, existing)
+
+    return merged
+
+
+def discover_articles(feeds: List[Dict[str, Any]],
+                      days_back: int,
+                      max_workers: Optional[int] = None,
+                      total_timeout: Optional[float] = 60) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch and parse every feed in parallel, isolating failures per feed.
+
+    Args:
+        feeds: Feed definitions, each a dict with
+            'source' (e.g. 'BBC'), 'url', and either 'stream_parser' (incremental,
+            see `iter_feed_articles`) or 'parser' (callable(xml_content, days_back=...)).
+            Optional keys: 'stop_at_cutoff' (feed is sorted newest first), 'category'
+            (tag added to the feed's articles), 'headers' and 'timeout'
+            (per-request timeout in seconds, default 10)
+        days_back: Passed through to every parser
+        max_workers: Threads used for discovery (default: one per feed)
+        total_timeout: Seconds to wait for all feeds; feeds still running after
+            that are reported and dropped (None waits indefinitely)
+
+    Returns:
+        Dict mapping source -> de-duplicated articles, in the order the feeds were configured
+    """
+    articles_by_source: Dict[str, List[Dict[str, Any]]] = {feed['source']: [] for feed in feeds}
+    if not feeds:
+        return articles_by_source
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(feeds))
+    try:
+        futures = [executor.submit(_fetch_feed, feed, days_back) for feed in feeds]
+        wait(futures, timeout=total_timeout)
+
+        # Merge in configuration order so the result doesn't depend on completion order
+        for feed, future in zip(feeds, futures):
+            if not future.done():
+                print(f"Error processing {feed['url']}: timed out after {total_timeout}s")
+                continue
+            try:
+                articles = future.result()
+            except Exception as e:
+                print(f"Error processing {feed['url']}: {e}")
+                continue
+            articles_by_source[feed['source']].extend(articles)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Feeds of the same source overlap (e.g. BBC front_page and world)
+    for source, articles in articles_by_source.items():
+        merged = merge_feed_items(articles)
+        if len(merged) < len(articles):
+            print(f"{source}: merged {len(articles) - len(merged)} duplicate feed items")
+        articles_by_source[source] = merged
+
+    counts = ', '.join(f"{source}: {len(articles)}" for source, articles in articles_by_source.items())
+    print(f"Discovered articles from {len(feeds)} feeds ({counts})")
+    return articles_by_source
@@ -0,0 +1,172 @@
+"""Pluggable HTML parser backends for article extraction.
+
+Every backend returns a document exposing the small part of the BeautifulSoup
+API the extractors use (`select_one`, `select`, and on nodes `get`,
+`get_text`, `find_parent`), so the selector lists run unchanged on any of them.
+
+Backends, fastest first:
+- 'selectolax': lexbor/modest C parser (optional `selectolax` package)
+- 'lxml': BeautifulSoup on the lxml tree builder (optional `lxml` package)
+- 'html.parser': BeautifulSoup on the pure-Python parser (always available)
+
+'auto' picks the fastest one installed. The default comes from the
+HTML_PARSER_BACKEND environment variable.
+"""
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+DEFAULT_BACKEND = os.environ.get('HTML_PARSER_BACKEND', 'auto')
+
+
+def available_backends() -> List[str]:
+    """Return the installed backends, fastest first"""
+    available = []
+    if _SelectolaxParser is not None:
+        available.append('selectolax')
+    if _HAS_LXML:
+        available.append('lxml')
+    available.append('html.parser')
+    return available
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Map a requested backend to one that is installed.
+
+    'auto' (or None with the default unset) means the fastest available. An
+    explicitly requested backend that isn't installed falls back to
+    'html.parser' rather than failing the extraction.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    if backend not in available_backends():
+        return 'html.parser'
+    return backend
+
+
+class _SelectolaxNode:
+    """BeautifulSoup-style view of a selectolax node"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    def get(self, attr: str, default: Any = None) -> Any:
+        value = self._node.attributes.get(attr)
+        if value is None:
+            return default
+        # BeautifulSoup returns multi-valued `class` as a list
+        if attr == 'class':
+            return value.split()
+        return value
+
+    def get_text(self, strip: bool = False) -> str:
+        return self._node.text(deep=True, separator='', strip=strip)
+
+    def find_parent(self, name: Union[str, Iterable[str]]) -> Optional['_SelectolaxNode']:
+        names = {name} if isinstance(name, str) else set(name)
+        parent = self._node.parent
+        while parent is not None:
+            if parent.tag in names:
+                return _SelectolaxNode(parent)
+            parent = parent.parent
+        return None
+
+    def select_one(self, selector: str) -> Optional['_SelectolaxNode']:
+        node = self._node.css_first(selector)
+        return _SelectolaxNode(node) if node is not None else None
+
+    def select(self, selector: str) -> List['_SelectolaxNode']:
+        return [_SelectolaxNode(node) for node in self._node.css(selector)]
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class _SelectolaxDocument:
+    """BeautifulSoup-style view of a selectolax document"""
+
+    def __init__(self, html: Union[bytes, str]):
+        if isinstance(html, bytes):
+            html = html.decode('utf-8', errors='replace')
+        self._tree = _SelectolaxParser(html)
+
+    def select_one(self, selector: str) -> Optional[_SelectolaxNode]:
+        node = self._tree.css_first(selector)
+        return _SelectolaxNode(node) if node is not None else None
+
+    def select(self, selector: str) -> List[_SelectolaxNode]:
+        return [_SelectolaxNode(node) for node in self._tree.css(selector)]
+
+
+def parse_html(html: Union[bytes, str], backend: Optional[str] = None, **bs4_kwargs):
+    """
+    Parse an HTML page with the chosen backend.
+
+    Args:
+        html: Raw page bytes or text
+        backend: 'auto', 'selectolax', 'lxml' or 'html.parser' (default: HTML_PARSER_BACKEND)
+        **bs4_kwargs: Extra BeautifulSoup arguments (ignored by selectolax)
+
+    Returns:
+        A BeautifulSoup object, or a selectolax document with the same selection API
+    """
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return _SelectolaxDocument(html)
+    return BeautifulSoup(html, backend, **bs4_kwargs)
+
+
+def compare_backends(pages: Dict[str, Union[bytes, str]],
+                     extract: Callable[..., Any],
+                     backends: Optional[List[str]] = None,
+                     reference: str = 'html.parser') -> Dict[str, Dict[str, Any]]:
+    """
+    Check that an extractor returns identical output on every backend.
+
+    Run this over a corpus of saved article pages before switching the
+    default backend.
+
+    Args:
+        pages: Mapping of page name -> raw HTML
+        extract: Extractor taking (html, backend=...), e.g. `extract_article_bbc`
+        backends: Backends to compare (default: every installed backend)
+        reference: Backend whose output the others must match
+
+    Returns:
+        Mapping of page name -> {backend: output} for every page where some
+        backend's output differs from the reference (empty when all match)
+    """
+    backends = backends or available_backends()
+    mismatches = {}
+    for name, html in pages.items():
+        expected = extract(html, backend=reference)
+        outputs = {backend: extract(html, backend=backend) for backend in backends}
+        if any(output != expected for output in outputs.values()):
+            mismatches[name] = {reference: expected, **outputs}
+    return mismatches
@@ -0,0 +1,246 @@
+"""Near-duplicate detection over article content (64-bit SimHash with banded lookup)."""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from unbiasedupdates.storage import _get_dynamodb_resource, get_aws_resources
+
+SIMHASH_BITS = 64
+# Fingerprints are split into BANDS pieces; two fingerprints within BANDS - 1
+# bits of each other must agree on at least one piece, so candidates are found
+# by exact band lookups
+BANDS = 8
+_BAND_BITS = SIMHASH_BITS // BANDS
+
+SIMHASH_TABLE = os.environ.get('SIMHASH_TABLE', 'news_simhash_bands')
+# Largest Hamming distance still treated as the same story (3 of 64 bits ~ 95% similar)
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.environ.get('NEAR_DUPLICATE_MAX_DISTANCE', '3'))
+# Only articles indexed within this many days are compared against; older band
+# items expire through DynamoDB TTL
+NEAR_DUPLICATE_WINDOW_DAYS = int(os.environ.get('NEAR_DUPLICATE_WINDOW_DAYS', '7'))
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash of `text` over word shingles (weighted by how often each occurs).
+
+    Lightly edited copies of a story differ in only a few bits.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= shingle_size:
+        shingles = Counter([' '.join(words)]) if words else Counter()
+    else:
+        shingles = Counter(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    vector = [0] * SIMHASH_BITS
+    for shingle, weight in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            vector[bit] += weight if (h >> bit) & 1 else -weight
+    return sum(1 << bit for bit, total in enumerate(vector) if total > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+def _band_keys(fingerprint: int, day: str) -> List[str]:
+    mask = (1 << _BAND_BITS) - 1
+    return [f"{band}:{(fingerprint >> (band * _BAND_BITS)) & mask:02x}:{day}" for band in range(BANDS)]
+
+
+def _days(window_days: int, now: Optional[datetime] = None) -> List[str]:
+    """UTC dates ('YYYY-MM-DD') of today and the `window_days` - 1 days before it"""
+    today = (now or datetime.now(timezone.utc)).date()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(window_days)]
+
+
+def _entry(title: str, fingerprint: int) -> str:
+    return f"{fingerprint:016x}:{title}"
+
+
+def _parse_entry(entry: str) -> Tuple[str, int]:
+    fingerprint, title = entry.split(':', 1)
+    return title, int(fingerprint, 16)
+
+
+class NearDuplicateIndex:
+    """
+    Fingerprints of summarized articles, looked up by band.
+
+    Each band key ('<band>:<value>:<UTC date>') maps to the set of
+    '<fingerprint>:<title>' entries indexed that day sharing that band, so no
+    item grows without bound. The bands live in a DynamoDB table (string sets,
+    appended atomically with ADD, expiring through TTL) so every run and
+    container sees every recent article, and are mirrored in memory so articles
+    summarized earlier in the same process are found without a read. Lookups
+    only compare against the last `window_days` days.
+    """
+
+    def __init__(self, table_name: Optional[str] = SIMHASH_TABLE,
+                 max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+                 window_days: int = NEAR_DUPLICATE_WINDOW_DAYS):
+        """
+        Args:
+            table_name: DynamoDB table holding the bands (None keeps the index in memory only)
+            max_distance: Largest Hamming distance counted as a near-duplicate (at most BANDS - 1)
+            window_days: Days of indexed articles compared against (at most 12, so a
+                lookup stays within one BatchGetItem call)
+        """
+        if not 0 <= max_distance < BANDS:
+            raise ValueError(f"max_distance must be between 0 and {BANDS - 1}")
+        if not 1 <= window_days <= 12:
+            raise ValueError("window_days must be between 1 and 12")
+        self.table_name = table_name
+        self.max_distance = max_distance
+        self.window_days = window_days
+        self._local: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.local()
+
+    def _table(self):
+        if not hasattr(self._thread, 'table'):
+            self._thread.table = _get_dynamodb_resource().Table(self.table_name)
+        return self._thread.table
+
+    def _stored_entries(self, band_keys: List[str], max_retries: int = 3) -> Set[str]:
+        dynamodb = _get_dynamodb_resource()
+        request = {self.table_name: {'Keys': [{'band_key': key} for key in band_keys]}}
+        entries: Set[str] = set()
+        for attempt in range(max_retries + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(self.table_name, []):
+                entries.update(item.get('entries', ()))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(0.05 * 2 ** attempt)
+        return entries
+
+    def find(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """
+        Return (title, distance) of the closest indexed article within
+        `max_distance` bits of `fingerprint`, or None.
+        """
+        band_keys = [key for day in _days(self.window_days) for key in _band_keys(fingerprint, day)]
+        with self._lock:
+            candidates = set().union(*(self._local.get(key, ()) for key in band_keys))
+        if self.table_name:
+            candidates |= self._stored_entries(band_keys)
+
+        best = None
+        for entry in candidates:
+            title, other = _parse_entry(entry)
+            distance = hamming_distance(fingerprint, other)
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (title, distance)
+        return best
+
+    def add(self, title: str, fingerprint: int):
+        """Index a summarized article's fingerprint under its `news_articles` title"""
+        entry = _entry(title, fingerprint)
+        days = _days(self.window_days)
+        band_keys = _band_keys(fingerprint, days[0])
+        with self._lock:
+            # Drop days that have left the window (warm containers live for hours)
+            for key in [key for key in self._local if key.rsplit(':', 1)[1] not in days]:
+                del self._local[key]
+            for key in band_keys:
+                self._local.setdefault(key, set()).add(entry)
+        if self.table_name:
+            expires_at = int(time.time()) + (self.window_days + 1) * 86400
+            for key in band_keys:
+                self._table().update_item(
+                    Key={'band_key': key},
+                    UpdateExpression='ADD entries :e SET expires_at = :x',
+                    ExpressionAttributeValues={':e': {entry}, ':x': expires_at},
+                )
+
+
+_index: Optional[NearDuplicateIndex] = None
+
+
+def configure_near_duplicates(index: Optional[NearDuplicateIndex]):
+    """Set the index consulted before summarizing (None disables near-duplicate reuse)"""
+    global _index
+    _index = index
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """Return the configured near-duplicate index, or None"""
+    return _index
+
+
+def find_near_duplicate(content: str) -> Optional[Tuple[str, int]]:
+    """
+    (title, distance) of an already summarized near-duplicate of `content`, or
+    None. A failed lookup is logged and treated as no match.
+    """
+    if _index is None:
+        return None
+    try:
+        return _index.find(simhash(content))
+    except Exception as e:
+        print(f"Near-duplicate lookup failed: {e}")
+        return None
+
+
+def register_content(title: str, content: str):
+    """
+    Add a newly summarized article to the index. Failures are logged, not
+    raised: the article itself has already been stored.
+    """
+    if _index is None:
+        return
+    try:
+        _index.add(title, simhash(content))
+    except Exception as e:
+        print(f"Failed to index content of '{title}' for near-duplicate detection: {e}")
+
+
+def backfill_near_duplicate_index(limit: Optional[int] = None) -> int:
+    """
+    Migration helper: fingerprint every stored article in `news_articles`.
+
+    Articles summarized before near-duplicate detection existed are otherwise
+    never matched. They are indexed under today's date, so they stay matchable
+    for one lookup window. Requires a configured index.
+
+    Args:
+        limit: Stop after this many items (None for the whole table)
+
+    Returns:
+        Number of articles indexed
+    """
+    if _index is None:
+        raise ValueError("No near-duplicate index configured")
+
+    table = get_aws_resources()
+    scan_kwargs = {'ProjectionExpression': '#t, #c',
+                   'ExpressionAttributeNames': {'#t': 'title', '#c': 'content'}}
+    indexed = 0
+
+    while limit is None or indexed < limit:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            if not item.get('content'):
+                continue
+            _index.add(item['title'], simhash(item['content']))
+            indexed += 1
+            if limit is not None and indexed >= limit:
+                break
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print(f"Indexed {indexed} stored articles for near-duplicate detection")
+    return indexed
@@ -0,0 +1,200 @@
+"""Staged article pipeline: fetch -> extract -> summarize -> persist, with bounded queues between stages."""
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from unbiasedupdates.llm import invoke_with_failover, llm_candidates
+from unbiasedupdates.storage import BatchItemWriter
+from unbiasedupdates.utils import (
+    ARTICLE_SOURCES, _article_thumbnail, _check_content, _check_existing_title, _check_url_index,
+    _failed_extraction, _store_summary, extract_article, fetch_article_html, print_result_progress
+)
+
+# Marks the end of a stage's input
+_STOP = object()
+
+
+class _Stage:
+    """
+    A pool of worker threads reading jobs from `in_queue`.
+
+    `fn(job)` either returns the job for the next stage, which is put on
+    `out_queue` (blocking while that queue is full, which is what pushes
+    backpressure upstream), or returns None after recording a final result.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                 workers: int, in_queue: queue.Queue, out_queue: Optional[queue.Queue],
+                 on_error: Callable[[Dict[str, Any], Exception], None]):
+        self.name = name
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.on_error = on_error
+        self.threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Signal end of input and wait for every worker to drain its queue"""
+        for _ in self.threads:
+            self.in_queue.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            job = self.in_queue.get()
+            if job is _STOP:
+                return
+            try:
+                out = self.fn(job)
+            except Exception as e:
+                self.on_error(job, e)
+                continue
+            if out is not None and self.out_queue is not None:
+                self.out_queue.put(out)
+
+
+def process_articles_pipeline(articles: List[Dict[str, Any]],
+                              source: str,
+                              model: str,
+                              headers: Dict[str, str],
+                              runnable=None,
+                              grunnable=None,
+                              fetch_workers: int = 8,
+                              extract_workers: int = 2,
+                              llm_workers: int = 5,
+                              persist_workers: int = 2,
+                              queue_size: int = 10,
+                              writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
+    """
+    Process articles through independent fetch, extract, summarize and persist stages
+
+    Each stage has its own thread count, so network fetches, HTML parsing and LLM
+    calls can be sized separately. Stages are connected by queues holding at most
+    `queue_size` jobs; a stage that gets ahead blocks until the next one catches up.
+
+    Args:
+        articles: List of article dictionaries
+        source: Key into ARTICLE_SOURCES ('BBC' or 'AJ')
+        model: Model to use ('openai' or 'gemini')
+        headers: Headers for web requests
+        runnable: OpenAI runnable instance (required if model='openai')
+        grunnable: Gemini runnable instance (required if model='gemini')
+        fetch_workers: Threads downloading article pages
+        extract_workers: Threads parsing HTML (each hands its page to the extraction
+            process pool when one is configured, so match it to the pool size)
+        llm_workers: Threads waiting on the LLM (maximum LLM calls in flight)
+        persist_workers: Threads writing to DynamoDB
+        queue_size: Capacity of each inter-stage queue
+        writer: Optional write-behind buffer for the DynamoDB writes (flushed by the caller)
+
+    Returns:
+        List of processing results, in the same order as `articles`
+    """
+    if model == 'openai' and runnable is None:
+        raise ValueError("runnable is required when model='openai'")
+    if model == 'gemini' and grunnable is None:
+        raise ValueError("grunnable is required when model='gemini'")
+    if model not in ('openai', 'gemini'):
+        raise ValueError(f"Unsupported model: {model}")
+    if source not in ARTICLE_SOURCES:
+        raise ValueError(f"Unknown source: {source}")
+
+    source_config = ARTICLE_SOURCES[source]
+    candidates = llm_candidates(model, runnable, grunnable)
+    llms = dict(candidates)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(articles)
+    results_lock = threading.Lock()
+
+    def finish(job, result):
+        with results_lock:
+            results[job['index']] = result
+        print_result_progress(result)
+
+    def on_error(job, e):
+        finish(job, {
+            'status': 'error',
+            'title': job.get('title') or job['article'].get('title', 'Unknown'),
+            'url': job['url'],
+            'message': str(e)
+        })
+
+    # 1. Download the article page, unless its URL is already indexed
+    def fetch(job):
+        skipped = _check_url_index(job['article'])
+        if skipped:
+            finish(job, skipped)
+            return None
+        try:
+            job['html'] = fetch_article_html(job['url'], headers, source_config['stop_markers'])
+        except Exception as e:
+            job['extracted'] = _failed_extraction(e)
+        return job
+
+    # 2. Parse title/content/image out of the HTML; failed fetches and
+    #    boilerplate never reach the LLM stage
+    def extract(job):
+        extracted = job.pop('extracted', None)
+        if extracted is None:
+            try:
+                extracted = extract_article(source, job.pop('html'))
+            except Exception as e:
+                extracted = _failed_extraction(e)
+        title, content, main_image_url, _ = extracted
+        job['title'] = title
+        job['content'] = content
+        rejection = _check_content(job['article'], source, title, content)
+        if rejection:
+            finish(job, rejection)
+            return None
+        job['thumbnail'] = _article_thumbnail(job['article'], source, main_image_url)
+        return job
+
+    # 3. Skip stored titles, reuse a near-duplicate's summary, or generate the summary
+    #    (retried, failing over to the other model)
+    def summarize(job):
+        done = _check_existing_title(job['article'], source, job['title'], job['content'],
+                                     job['thumbnail'], writer)
+        if done:
+            finish(job, done)
+            return None
+
+        job['llm_output'], job['model'] = invoke_with_failover(candidates, {'content': job['content']})
+        return job
+
+    # 4. Validate the LLM output and write the item
+    def persist(job):
+        finish(job, _store_summary(job['article'], source, job['title'], job['content'], job['thumbnail'],
+                                   job['llm_output'], job['model'], llms[job['model']], writer))
+        return None
+
+    fetch_q, extract_q, summarize_q, persist_q = (queue.Queue(maxsize=queue_size) for _ in range(4))
+    stages = [
+        _Stage('fetch', fetch, fetch_workers, fetch_q, extract_q, on_error),
+        _Stage('extract', extract, extract_workers, extract_q, summarize_q, on_error),
+        _Stage('summarize', summarize, llm_workers, summarize_q, persist_q, on_error),
+        _Stage('persist', persist, persist_workers, persist_q, None, on_error),
+    ]
+
+    print(f"Processing {len(articles)} articles through pipeline "
+          f"(fetch={fetch_workers}, extract={extract_workers}, llm={llm_workers}, persist={persist_workers})")
+
+    for stage in stages:
+        stage.start()
+
+    # Feeding blocks whenever the fetch queue is full
+    for index, article in enumerate(articles):
+        fetch_q.put({'index': index, 'article': article, 'url': article['link']})
+
+    # Drain stage by stage: a stage only stops once everything upstream has finished
+    for stage in stages:
+        stage.stop()
+
+    return results
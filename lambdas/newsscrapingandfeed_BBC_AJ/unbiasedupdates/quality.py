@@ -0,0 +1,72 @@
+"""Pre-LLM content quality gate: keeps failed fetches and boilerplate pages away from the models."""
+import os
+import re
+from typing import Any, Dict, Optional
+
+MIN_CONTENT_CHARS = int(os.environ.get('MIN_CONTENT_CHARS', '300'))
+MIN_PARAGRAPHS = int(os.environ.get('MIN_CONTENT_PARAGRAPHS', '2'))
+# Reject when more than this share of the text is cookie banners, sign-up prompts etc.
+MAX_BOILERPLATE_RATIO = float(os.environ.get('MAX_BOILERPLATE_RATIO', '0.5'))
+# Only paragraphs up to this long can count as boilerplate: banners and prompts
+# are short, while a real paragraph that happens to mention copyright or
+# cookies (e.g. a story about a copyright lawsuit) is not
+BOILERPLATE_MAX_CHARS = int(os.environ.get('BOILERPLATE_MAX_CHARS', '150'))
+
+# Placeholders the extractors return instead of real content / titles
+ERROR_SENTINELS = ('Error fetching content', 'Content could not be extracted')
+ERROR_TITLES = ('Error extracting title', 'Title not found')
+
+# Phrases that only appear in site chrome, never as ordinary news prose
+_BOILERPLATE_RE = re.compile(
+    r'(accept|use|manage) (all )?cookies|cookie (settings|preferences|policy)|'
+    r'(enable|turn on) javascript|javascript is (disabled|required)|'
+    r'(sign up|subscribe) (for|to) (our|the) newsletter|follow us on|download (the|our) app|'
+    r'all rights reserved|(©|copyright) \d{4}|terms of (use|service)|privacy policy|'
+    r'^advertisement$|share this (article|story|page)|^related topics$|^read more\b|click here',
+    re.IGNORECASE
+)
+
+
+def _rejection_reason(title: str, content: str) -> Optional[str]:
+    if not content or content.startswith(ERROR_SENTINELS):
+        return content[:200] if content else 'No content'
+    if title in ERROR_TITLES:
+        return title
+
+    if len(content) < MIN_CONTENT_CHARS:
+        return f'Content too short ({len(content)} chars, minimum {MIN_CONTENT_CHARS})'
+
+    paragraphs = [p for p in content.split('\n\n') if p.strip()]
+    if len(paragraphs) < MIN_PARAGRAPHS:
+        return f'Too few paragraphs ({len(paragraphs)}, minimum {MIN_PARAGRAPHS})'
+
+    boilerplate_chars = sum(len(p) for p in paragraphs
+                            if len(p.strip()) <= BOILERPLATE_MAX_CHARS and _BOILERPLATE_RE.search(p.strip()))
+    ratio = boilerplate_chars / sum(len(p) for p in paragraphs)
+    if ratio > MAX_BOILERPLATE_RATIO:
+        return f'Mostly boilerplate ({ratio:.0%} of text)'
+
+    return None
+
+
+def check_content_quality(title: str, content: str, url: str) -> Optional[Dict[str, Any]]:
+    """
+    Decide whether extracted content is worth sending to an LLM.
+
+    Rejects extractor error placeholders, missing titles (the title is the
+    table key), and content that is too short, has too few paragraphs, or is
+    mostly boilerplate (short paragraphs made of cookie, newsletter, copyright
+    and similar site-chrome phrases).
+
+    Returns:
+        None if the content passes, otherwise a result dict with status 'rejected'
+    """
+    reason = _rejection_reason(title, content)
+    if reason is None:
+        return None
+    return {
+        'status': 'rejected',
+        'title': title,
+        'url': url,
+        'message': f'Content rejected: {reason}'
+    }
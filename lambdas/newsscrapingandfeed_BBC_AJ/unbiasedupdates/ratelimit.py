@@ -0,0 +1,160 @@
+"""Token-bucket rate limiters shared by every worker, keyed by upstream host or LLM provider."""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# (requests per second, burst) per upstream. Hosts match their subdomains too,
+# so 'bbc.co.uk' covers www.bbc.co.uk and newsrss.bbc.co.uk.
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'bbc.co.uk': (5.0, 10),
+    'bbc.com': (5.0, 10),
+    'aljazeera.com': (3.0, 5),
+    'openai': (2.0, 5),
+    'gemini': (2.0, 5),
+}
+
+# Longest Retry-After that is waited out; a longer one fails the request instead
+# of stalling every worker that shares the bucket
+MAX_RETRY_AFTER = float(os.environ.get('MAX_RETRY_AFTER_SECONDS', '60'))
+
+# time.monotonic() by which the current invocation has to finish (None: no deadline)
+_deadline: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`.
+
+    Callers reserve a token and sleep for the returned delay, so waiting
+    happens outside the lock and works for both threads and coroutines.
+    `pause` blocks the bucket entirely until a point in time (Retry-After).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(delay, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` (extends, never shortens, an existing pause)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RateLimiterRegistry:
+    """Named token buckets; keys without a configured bucket are not limited."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        for key, (rate, burst) in (limits or {}).items():
+            self.configure(key, rate, burst)
+
+    def configure(self, key: str, rate: float, burst: int):
+        with self._lock:
+            self._buckets[key] = TokenBucket(rate, burst)
+
+    def _bucket(self, key: str) -> Optional[TokenBucket]:
+        return self._buckets.get(key)
+
+    def acquire(self, key: str):
+        """Block until `key` may make one more request"""
+        bucket = self._bucket(key)
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def acquire_async(self, key: str):
+        """Coroutine version of `acquire`"""
+        bucket = self._bucket(key)
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def pause(self, key: str, seconds: float):
+        """Stop handing out tokens for `key` for `seconds` (e.g. after a 429)"""
+        bucket = self._bucket(key)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+
+rate_limiters = RateLimiterRegistry(DEFAULT_RATE_LIMITS)
+
+
+def configure_rate_limits(limits: Dict[str, Tuple[float, int]]):
+    """Override the (rate, burst) of some hosts/providers on the shared registry"""
+    for key, (rate, burst) in limits.items():
+        rate_limiters.configure(key, rate, burst)
+
+
+def host_limit_key(url: str) -> str:
+    """
+    Return the registry key for a URL: the longest configured domain suffix of
+    its host, or the bare host when none is configured.
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        candidate = '.'.join(labels[i:])
+        if rate_limiters._bucket(candidate) is not None:
+            return candidate
+    return host
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds to wait"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def set_invocation_deadline(remaining_seconds: Optional[float]):
+    """
+    Record how long the current invocation has left, so no Retry-After pause
+    runs past it (e.g. `context.get_remaining_time_in_millis() / 1000`).
+    None removes the deadline.
+    """
+    global _deadline
+    _deadline = None if remaining_seconds is None else time.monotonic() + remaining_seconds
+
+
+def retry_after_allowed(seconds: float) -> bool:
+    """
+    Whether a Retry-After of `seconds` is short enough to wait out: at most
+    MAX_RETRY_AFTER, and ending before the invocation deadline.
+    """
+    if seconds > MAX_RETRY_AFTER:
+        return False
+    return _deadline is None or time.monotonic() + seconds < _deadline
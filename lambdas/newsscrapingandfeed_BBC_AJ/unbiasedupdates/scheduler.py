@@ -0,0 +1,93 @@
+"""Sliding-window work scheduler: keeps N tasks in flight and refills slots as they free up."""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+def run_sliding_window(items: Iterable[Any],
+                       worker: Callable[[Any], Any],
+                       max_in_flight: int,
+                       on_result: Optional[Callable[[Any, Any], None]] = None,
+                       on_error: Optional[Callable[[Any, Exception], None]] = None):
+    """
+    Run `worker(item)` for every item with at most `max_in_flight` calls running at once.
+
+    Unlike fixed batches there is no barrier: as soon as one call finishes, the
+    next item is pulled from `items` and started, so one slow item never holds
+    back the others. `items` is consumed lazily and may be a generator.
+
+    Args:
+        items: Work items (any iterable)
+        worker: Callable run in a worker thread for each item
+        max_in_flight: Number of concurrently running calls
+        on_result: Called as on_result(item, result) in the scheduling thread
+        on_error: Called as on_error(item, exception) if `worker` raised
+
+    Returns:
+        None. Results are delivered through the callbacks in completion order.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    item_iter = iter(items)
+    in_flight = {}
+
+    def refill(executor):
+        while len(in_flight) < max_in_flight:
+            try:
+                item = next(item_iter)
+            except StopIteration:
+                return
+            in_flight[executor.submit(worker, item)] = item
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        refill(executor)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(item, e)
+                    continue
+                if on_result is not None:
+                    on_result(item, result)
+            refill(executor)
+
+
+def interleave_weighted(queues: Dict[str, Iterable[Any]],
+                        weights: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Merge several work queues into one stream of (name, item) using smooth weighted round-robin.
+
+    With weights {'BBC': 2, 'AJ': 1} the stream goes BBC, AJ, BBC, BBC, AJ, BBC, ...
+    so every queue gets its share of the slots from the start instead of waiting
+    for the previous queue to drain. A queue that runs out simply drops out of
+    the rotation. Queues are consumed lazily.
+
+    Args:
+        queues: Mapping of queue name -> items
+        weights: Relative share per queue name (default 1 each)
+    """
+    weights = weights or {}
+    iterators = {name: iter(items) for name, items in queues.items()}
+    shares = {name: weights.get(name, 1) for name in iterators}
+    if any(share <= 0 for share in shares.values()):
+        raise ValueError("weights must be positive")
+    current = {name: 0 for name in iterators}
+
+    while iterators:
+        total = sum(shares[name] for name in iterators)
+        for name in iterators:
+            current[name] += shares[name]
+        name = max(iterators, key=lambda n: current[n])
+        current[name] -= total
+        try:
+            item = next(iterators[name])
+        except StopIteration:
+            del iterators[name]
+            del current[name]
+            continue
+        yield name, item
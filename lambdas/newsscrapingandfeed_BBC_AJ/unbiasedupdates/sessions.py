@@ -0,0 +1,199 @@
+"""Pooled keep-alive HTTP sessions shared by the feed and article fetchers."""
+import os
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from unbiasedupdates.ratelimit import host_limit_key, parse_retry_after, rate_limiters, retry_after_allowed
+
+# urllib3 only decodes brotli bodies when one of these packages is importable,
+# so only advertise `br` when we can actually read the response.
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+
+# Largest (decoded) body http_get_bounded will hold in memory
+DEFAULT_MAX_BYTES = int(os.environ.get('HTTP_MAX_BYTES', str(5 * 1024 * 1024)))
+# After a stop marker, read and discard at most this much of the rest so the
+# connection can go back to the pool; a longer tail closes the connection
+DEFAULT_DRAIN_BYTES = int(os.environ.get('HTTP_DRAIN_BYTES', str(256 * 1024)))
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+def _new_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept-Encoding': _ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+def configure_http_sessions(pool_size: int = DEFAULT_POOL_SIZE):
+    """
+    Set the per-host connection pool size and drop any existing sessions.
+
+    Args:
+        pool_size: Maximum number of kept-alive connections per host. Should be at
+            least the number of workers fetching from the same host concurrently.
+    """
+    global _pool_size
+    with _sessions_lock:
+        _pool_size = pool_size
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_http_session(url: str) -> requests.Session:
+    """
+    Return the shared session for the host of `url`, creating it on first use.
+
+    Sessions live at module level, so warm Lambda invocations reuse open
+    connections. The underlying urllib3 pool is thread-safe and is shared by
+    every worker thread.
+    """
+    key = _host_key(url)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _new_session(_pool_size)
+                _sessions[key] = session
+    return session
+
+
+# Status codes after which the host is paused for its Retry-After period
+_THROTTLE_STATUSES = (429, 503)
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+             max_throttle_retries: int = 2, **kwargs) -> requests.Response:
+    """
+    Drop-in replacement for `requests.get` that goes through the per-host session pool.
+
+    Every request first takes a token from the host's shared rate limiter. A 429
+    or 503 pauses that host for everyone (honoring Retry-After) and the request
+    is retried up to `max_throttle_retries` times; the last response is returned
+    as-is so callers still see the error status. A Retry-After too long to wait
+    out (see `retry_after_allowed`) returns the response straight away.
+    """
+    session = get_http_session(url)
+    limit_key = host_limit_key(url)
+
+    for attempt in range(max_throttle_retries + 1):
+        rate_limiters.acquire(limit_key)
+        response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+        if response.status_code not in _THROTTLE_STATUSES or attempt == max_throttle_retries:
+            return response
+
+        wait = parse_retry_after(response.headers.get('Retry-After'), default=2.0 ** attempt)
+        if not retry_after_allowed(wait):
+            print(f"Throttled by {limit_key} ({response.status_code}), Retry-After {wait:.0f}s is too long; giving up")
+            return response
+        print(f"Throttled by {limit_key} ({response.status_code}), pausing {wait:.1f}s")
+        rate_limiters.pause(limit_key, wait)
+        response.close()
+
+
+def http_get_bounded(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                     max_bytes: int = DEFAULT_MAX_BYTES,
+                     content_types: Optional[Iterable[str]] = HTML_CONTENT_TYPES,
+                     stop_markers: Iterable[bytes] = (),
+                     drain_bytes: int = DEFAULT_DRAIN_BYTES,
+                     chunk_size: int = 64 * 1024) -> bytes:
+    """
+    Stream a response body into memory, refusing to hold more than `max_bytes`.
+
+    Args:
+        url: URL to fetch (through `http_get`, so pooled and rate limited)
+        headers: Request headers
+        timeout: Connect/read timeout in seconds
+        max_bytes: Cap on the decoded body; larger responses raise ValueError
+            without being read further
+        content_types: Accepted media types (None accepts anything). A response
+            without a Content-Type header is accepted.
+        stop_markers: Byte strings (e.g. b'</main>') after which the rest of the
+            body is not needed; nothing after the first one that arrives is kept
+        drain_bytes: How much of the unneeded rest to read and discard. If the
+            body ends within it, the kept-alive connection returns to the pool;
+            otherwise the connection is closed, which saves the download but
+            costs the next request to this host a new TCP/TLS handshake
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        The body, possibly cut short after a stop marker
+
+    Raises:
+        requests.HTTPError: On a non-2xx response
+        ValueError: On an unexpected content type or an oversized body
+    """
+    stop_markers = tuple(stop_markers)
+    overlap = max((len(marker) for marker in stop_markers), default=1) - 1
+
+    with http_get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_types is not None and content_type and content_type not in content_types:
+            raise ValueError(f"Unexpected content type {content_type!r} for {url}")
+
+        declared = response.headers.get('Content-Length', '')
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(f"Response from {url} is {declared} bytes (limit {max_bytes})")
+
+        body = bytearray()
+        drained = None  # bytes discarded since the stop marker
+        for chunk in response.iter_content(chunk_size):
+            if drained is not None:
+                drained += len(chunk)
+                if drained > drain_bytes:
+                    # Closing the unread response drops the connection instead of draining it
+                    break
+                continue
+            # Only the new bytes (plus a marker-sized overlap) need searching
+            search_from = max(len(body) - overlap, 0)
+            body += chunk
+            if len(body) > max_bytes:
+                raise ValueError(f"Response from {url} exceeds {max_bytes} bytes")
+            if stop_markers and any(body.find(marker, search_from) != -1 for marker in stop_markers):
+                remaining = int(declared) - response.raw.tell() if declared.isdigit() else 0
+                if remaining > drain_bytes:
+                    break
+                # Small (or unknown) rest: keep reading to the end, up to drain_bytes,
+                # so the connection stays reusable
+                drained = 0
+
+    return bytes(body)
+
+
+def close_http_sessions():
+    """Close every pooled session (mainly for local runs and tests)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,73 @@
+"""Canonical article URLs, used for de-duplication and as the basis of storage keys."""
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Hosts that serve the same articles, mapped to the one we key on
+HOST_ALIASES = {
+    'bbc.co.uk': 'www.bbc.co.uk',
+    'bbc.com': 'www.bbc.co.uk',
+    'www.bbc.com': 'www.bbc.co.uk',
+    'm.bbc.co.uk': 'www.bbc.co.uk',
+    'm.bbc.com': 'www.bbc.co.uk',
+    'aljazeera.com': 'www.aljazeera.com',
+    'm.aljazeera.com': 'www.aljazeera.com',
+}
+
+# Query parameters that identify the article, per canonical host. Hosts listed
+# here keep only these parameters; any other host keeps everything except
+# TRACKING_PARAMS.
+QUERY_ALLOWLIST = {
+    'www.bbc.co.uk': set(),
+    'www.aljazeera.com': set(),
+}
+
+TRACKING_PARAMS = {'at_medium', 'at_campaign', 'at_link_origin', 'at_format', 'at_bbc_team',
+                   'at_link_id', 'at_link_type', 'at_ptr_name', 'at_ptr_type', 'at_campaign_type',
+                   'fbclid', 'gclid', 'ocid', 'xtor', 'ns_mchannel', 'ns_source', 'ns_campaign',
+                   'ns_linkname', 'ns_fee', 'traffic_source', 'ref', 'src'}
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _keep_param(host: str, name: str) -> bool:
+    allowed = QUERY_ALLOWLIST.get(host)
+    if allowed is not None:
+        return name in allowed
+    return not (name.startswith('utm_') or name in TRACKING_PARAMS)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Return the canonical form of an article URL.
+
+    - scheme forced to https
+    - host lowercased, default port and `www`/mobile aliases folded (HOST_ALIASES)
+    - fragment dropped
+    - query reduced to the host's allowlisted parameters (or stripped of
+      tracking parameters for unknown hosts) and sorted
+    - duplicate slashes collapsed and the trailing slash removed
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    host = HOST_ALIASES.get(host, host)
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if _keep_param(host, name))
+
+    return urlunsplit(('https', netloc, path, urlencode(params), ''))
+
+
+def url_key(url: str) -> str:
+    """Stable 32-character key for a URL: a SHA-256 prefix of its canonical form"""
+    return hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()[:32]
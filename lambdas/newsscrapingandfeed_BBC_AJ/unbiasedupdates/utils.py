@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 from langchain.prompts import (
     ChatMessagePromptTemplate,
     ChatPromptTemplate,
@@ -6,6 +6,7 @@ from langchain.prompts import (
     SystemMessagePromptTemplate,
 )
 from langchain_core.output_parsers import StrOutputParser
+import io
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import requests
@@ -18,7 +19,19 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 import threading
+from collections import Counter
 from unbiasedupdates.prompts import SUMMARY_GEN_SYS_TEMP
+from unbiasedupdates.sessions import http_get_bounded
+from unbiasedupdates.llm import discard_cached_output, invoke_with_failover, llm_candidates
+from unbiasedupdates.quality import check_content_quality
+from unbiasedupdates.near_duplicates import find_near_duplicate, register_content
+from unbiasedupdates.urls import canonicalize_url
+from unbiasedupdates.extraction import ExtractionPlan
+from unbiasedupdates.extraction_pool import get_extraction_pool
+from unbiasedupdates.scheduler import interleave_weighted, run_sliding_window
+from unbiasedupdates.storage import (
+    BatchItemWriter, get_aws_resources, is_article_indexed, mark_article_indexed, save_article_item
+)
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 import os
@@ -137,15 +150,46 @@ def gemini_runnable(llm, template:str):
     return runnable
 
 
+_BBC_RSS_NS = {
+    'media': 'http://search.yahoo.com/mrss/',
+}
+
+
+def _parse_bbc_rss_item(item) -> Optional[Tuple[datetime, Dict[str, Any]]]:
+    """Turn one RSS <item> element into (pub_date, article), or None if it isn't a usable news article"""
+    title_el = item.find('title')
+    link_el = item.find('link')
+    pubDate_el = item.find('pubDate')
+    thumb_el = item.find('media:thumbnail', _BBC_RSS_NS)
+    guid_el = item.find('guid')
+
+    if title_el is None or link_el is None or pubDate_el is None:
+        return None
+
+    link_text = link_el.text.strip()
+    if "/news/articles/" not in link_text:
+        return None
+
+    try:
+        pub_date = datetime.strptime(pubDate_el.text.strip(), '%a, %d %b %Y %H:%M:%S %Z')
+    except ValueError:
+        return None
+
+    return pub_date, {
+        'title': title_el.text.strip(),
+        'link': link_text,
+        'canonical_url': canonicalize_url(link_text),
+        'pubDate': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'thumbnail': thumb_el.attrib['url'] if thumb_el is not None else None,
+        'guid': guid_el.text.strip() if guid_el is not None and guid_el.text else None
+    }
+
+
 def parse_rss_feed_bbc(xml_content, days_back=1):
     """
     Parse BBC RSS XML and return a list of dicts for articles published within `days_back` days.
-    Each dict includes title, link, pubDate, and thumbnail URL.
+    Each dict includes title, link, canonical URL, pubDate, thumbnail URL and the feed GUID.
     """
-    ns = {
-        'media': 'http://search.yahoo.com/mrss/',
-    }
-
     root = ET.fromstring(xml_content)
     items = []
 
@@ -154,170 +198,409 @@ def parse_rss_feed_bbc(xml_content, days_back=1):
     date_limit = today - timedelta(days=days_back)
 
     for item in root.findall('.//item'):
-        title_el = item.find('title')
-        link_el = item.find('link')
-        pubDate_el = item.find('pubDate')
-        thumb_el = item.find('media:thumbnail', ns)
+        parsed = _parse_bbc_rss_item(item)
+        if parsed is not None and parsed[0] >= date_limit:
+            items.append(parsed[1])
+
+    return items
 
-        if title_el is None or link_el is None or pubDate_el is None:
-            continue
-        
-        link_text = link_el.text.strip()
-        if "/news/articles/" not in link_text:
-            continue
 
+def _iterparse_records(source, tag: str) -> Iterator[Any]:
+    """
+    Incrementally parse XML from `source` and yield every element named `tag` once it is complete.
+
+    Each yielded element is detached from its parent and cleared after the
+    consumer moves on, so memory stays flat however long the document is.
+
+    Args:
+        source: Raw bytes or a binary file-like object (e.g. a streamed response's `raw`)
+        tag: Fully qualified tag name, e.g. 'item' or '{namespace}url'
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
 
-        try:
-            pub_date = datetime.strptime(pubDate_el.text.strip(), '%a, %d %b %Y %H:%M:%S %Z')
-        except ValueError:
+    open_elements = []
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
             continue
 
+        open_elements.pop()
+        if elem.tag == tag:
+            yield elem
+            if open_elements:
+                open_elements[-1].remove(elem)
+            elem.clear()
+
+
+def iter_rss_feed_bbc(source, days_back=1, stop_at_cutoff=False) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `parse_rss_feed_bbc`: yields each article as soon as its <item> is parsed.
+
+    Args:
+        source: Raw bytes or a binary file-like object
+        days_back: Only yield articles published within this many days
+        stop_at_cutoff: Stop reading at the first item older than the cutoff.
+            Only correct for feeds sorted newest first.
+    """
+    date_limit = datetime.utcnow() - timedelta(days=days_back)
+
+    for item in _iterparse_records(source, 'item'):
+        parsed = _parse_bbc_rss_item(item)
+        if parsed is None:
+            continue
+        pub_date, article = parsed
         if pub_date >= date_limit:
-            article = {
-                'title': title_el.text.strip(),
-                'link': link_el.text.strip(),
-                'pubDate': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'thumbnail': thumb_el.attrib['url'] if thumb_el is not None else None
-            }
-            items.append(article)
+            yield article
+        elif stop_at_cutoff:
+            return
 
-    return items
+def _failed_extraction(error: Exception) -> Tuple[str, str, str, str]:
+    """
+    The (title, content, main_image_url, publication_date) placeholder for a page
+    that could not be fetched or parsed; the quality gate rejects it.
+    """
+    return "Error extracting title", f"Error fetching content: {str(error)}", "", "Date not found"
 
-def get_article_content_and_images_bbc(url, headers):
+
+def fetch_article_html(url: str, headers: Dict[str, str], stop_markers: Tuple[bytes, ...] = ()) -> bytes:
     """
-    Fetches the title, content, main image, and date of a single article
-    
+    Download an article page through the pooled HTTP session
+
+    The body is streamed with a size cap (HTTP_MAX_BYTES) and must be HTML.
+
     Args:
-        url (str): Article URL
-        headers (dict): Request headers
-        
-    Returns:
-        tuple: (title, content_string, main_image_url, publication_date)
+        url: Article URL
+        headers: Request headers
+        stop_markers: Stop downloading once one of these arrives (see ARTICLE_SOURCES)
+
+    Raises:
+        requests.HTTPError: On a non-2xx response
+        ValueError: If the page is not HTML or is too large
     """
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+    return http_get_bounded(url, headers=headers, timeout=10, stop_markers=stop_markers)
+
+
+def _element_text(element) -> str:
+    return element.get_text(strip=True)
+
+
+def _element_date(element) -> str:
+    # Try to get the datetime attribute first, then text content
+    return element.get('datetime') or element.get_text(strip=True)
+
+
+def _image_src(img) -> Optional[str]:
+    return img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+def _bbc_image_url(img) -> Optional[str]:
+    img_url = _image_src(img)
+    if img_url:
+        if img_url.startswith('//'):
+            img_url = 'https:' + img_url
+        elif img_url.startswith('/'):
+            img_url = 'https://www.bbc.co.uk' + img_url
 
-        # EXTRACT TITLE
-        title = ""
-        title_selectors = [
+        if 'ichef.bbci.co.uk' in img_url:
+            return img_url
+    return None
+
+
+def _bbc_paragraphs(elements) -> List[str]:
+    texts = (element.get_text(strip=True) for element in elements)
+    return [text for text in texts if text and len(text) > 20]
+
+
+# The article body sits in <main>/<article>; h1 and time are kept wherever they are
+_ARTICLE_REGIONS = ['main', 'article', 'h1', 'time']
+
+BBC_EXTRACTION_PLAN = ExtractionPlan(name='BBC', regions=_ARTICLE_REGIONS, fields={
+    'title': {
+        'selectors': [
             'h1[id="main-heading"]',
             'h1.ssrcss-1s9pby4-Heading',
             'h1 span[role="text"]',
             'h1',
-        ]
-        
-        for selector in title_selectors:
-            title_element = soup.select_one(selector)
-            if title_element:
-                title = title_element.get_text(strip=True)
-                break
-        
-        if not title:
-            title = "Title not found"
-
-        # EXTRACT DATE
-        publication_date = ""
-        date_selectors = [
+        ],
+        'value': _element_text,
+    },
+    'date': {
+        'selectors': [
             'time[data-testid="timestamp"]',  # BBC timestamp element
             'time[datetime]',  # Generic time with datetime attribute
             '[data-component="metadata-block"] time',  # Time in metadata block
             '.ssrcss-1pvwv4b-MetadataSnippet time',  # BBC metadata time
-        ]
-        
-        for selector in date_selectors:
-            date_element = soup.select_one(selector)
-            if date_element:
-                # Try to get the datetime attribute first, then text content
-                publication_date = (date_element.get('datetime') or 
-                                  date_element.get_text(strip=True))
-                break
-        
-        if not publication_date:
-            publication_date = "Date not found"
-
-        # EXTRACT CONTENT (existing code)
-        content_selectors = [
+        ],
+        'value': _element_date,
+    },
+    'content': {
+        'selectors': [
             '[data-component="text-block"] p',
             '.story-body__inner p',
             '[data-component="text-block"]',
             'article p',
             '.gel-body-copy p',
             '.ssrcss-1q0x1qg-Paragraph p'
-        ]
-
-        content_paragraphs = []
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                for element in elements:
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 20:
-                        content_paragraphs.append(text)
-                break
-
-        # EXTRACT MAIN IMAGE (existing code)
-        main_image_url = ""
-        image_selectors = [
+        ],
+        'value': _bbc_paragraphs,
+        'many': True,
+    },
+    'image': {
+        'selectors': [
             'article img.ssrcss-11yxrdo-Image',
             '[data-component="image-block"] img',
             'figure img',
             'img[src*="ichef.bbci.co.uk"]'
-        ]
-
-        for selector in image_selectors:
-            img = soup.select_one(selector)
-            if img:
-                img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                if img_url:
-                    if img_url.startswith('//'):
-                        img_url = 'https:' + img_url
-                    elif img_url.startswith('/'):
-                        img_url = 'https://www.bbc.co.uk' + img_url
-                    
-                    if 'ichef.bbci.co.uk' in img_url:
-                        main_image_url = img_url
-                        break
-
-        content = '\n\n'.join(content_paragraphs) if content_paragraphs else "Content could not be extracted"
-
-        return title, content, main_image_url, publication_date
+        ],
+        'value': _bbc_image_url,
+    },
+})
 
-    except Exception as e:
-        return "Error extracting title", f"Error fetching content: {str(e)}", "", "Date not found"
 
+def extract_article_bbc(html, backend: Optional[str] = None) -> Tuple[str, str, str, str]:
+    """
+    Extracts the title, content, main image, and date from a BBC article page
+
+    All fields are resolved in a single pass over the article regions of the page
+    (see BBC_EXTRACTION_PLAN).
+
+    Args:
+        html (bytes | str): Raw article HTML
+        backend (str): HTML parser backend (see html_backends; default HTML_PARSER_BACKEND)
+
+    Returns:
+        tuple: (title, content_string, main_image_url, publication_date)
+    """
+    fields = BBC_EXTRACTION_PLAN.extract(html, backend)
+
+    title = fields['title'] or "Title not found"
+    publication_date = fields['date'] or "Date not found"
+    main_image_url = fields['image'] or ""
+    content_paragraphs = fields['content']
+
+    content = '\n\n'.join(content_paragraphs) if content_paragraphs else "Content could not be extracted"
 
-# Thread-local storage for AWS resources
-thread_local = threading.local()
+    return title, content, main_image_url, publication_date
 
-def get_aws_resources():
-    """Return DynamoDB table using local profile only if not running inside AWS Lambda"""
+
+def get_article_content_and_images_bbc(url, headers):
+    """
+    Fetches the title, content, main image, and date of a single article
     
-    if not hasattr(thread_local, 'table'):
-        # Auto-detect if running in Lambda environment
-        running_in_lambda = 'AWS_LAMBDA_FUNCTION_NAME' in os.environ
+    Args:
+        url (str): Article URL
+        headers (dict): Request headers
+        
+    Returns:
+        tuple: (title, content_string, main_image_url, publication_date)
+    """
+    try:
+        html = fetch_article_html(url, headers, ARTICLE_SOURCES['BBC']['stop_markers'])
+        return extract_article('BBC', html)
+
+    except Exception as e:
+        return _failed_extraction(e)
+
+
+def _parse_summary_output(llm_output: str, title: str, url: str) -> Tuple[Optional[Tuple[str, str, str]], Optional[Dict[str, Any]]]:
+    """
+    Extract the insights, thumbnail snippet and generated title from an LLM response.
+
+    Returns:
+        tuple: ((insights, summary, gen_title), None) on success, or
+        (None, parsing_error_result) when a field is missing or empty.
+    """
+    try:
+        insights = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='insights')
+        summary = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='thumbnail_snippet')
+        gen_title = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='title')
+    except Exception as parsing_error:
+        return None, {
+            'status': 'parsing_error',
+            'title': title,
+            'url': url,
+            'message': f'Error extracting fields from LLM response: {str(parsing_error)}',
+            'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output  # First 500 chars for debugging
+        }
+
+    # Validate that all required fields were extracted
+    if not all([insights, summary, gen_title]):
+        missing_fields = []
+        if not insights: missing_fields.append('insights')
+        if not summary: missing_fields.append('thumbnail_snippet')
+        if not gen_title: missing_fields.append('title')
+
+        return None, {
+            'status': 'parsing_error',
+            'title': title,
+            'url': url,
+            'message': f'Missing or empty fields: {", ".join(missing_fields)}',
+            'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output,
+            'extracted_data': {
+                'insights': insights if insights else '',
+                'summary': summary if summary else '',
+                'gen_title': gen_title if gen_title else ''
+            }
+        }
+
+    return (insights, summary, gen_title), None
+
+
+def _build_article_item(article: Dict[str, Any], source: str, title: str, content: str,
+                        thumbnail: Optional[str], insights: str, summary: str, gen_title: str,
+                        model: Optional[str] = None) -> Dict[str, Any]:
+    """Build the DynamoDB item for a summarized article (with fallback values and the model that summarized it)."""
+    item = {
+        'title': title,
+        'url': article.get('link'),
+        'publisheddate': article.get('pubDate'),
+        'thumbnail': thumbnail,
+        'content': content,
+        'source': source,
+        'generated_title': gen_title or title,  # Fallback to original title
+        'summary': summary or content[:500] + "...",  # Fallback to truncated content
+        'insights': insights or "No insights available"  # Fallback message
+    }
+    if model:
+        item['model'] = model
+    # Feed sections the story appeared in (union across overlapping feeds)
+    if article.get('categories'):
+        item['categories'] = article['categories']
+    return item
 
-        if running_in_lambda:
-            # Use IAM role in Lambda
-            session = boto3.Session(region_name='us-east-1')
-        else:
-            # Local development (assumes profile is configured)
-            session = boto3.Session(profile_name='root-access', region_name='us-east-1')
 
-        dynamodb_resource = session.resource('dynamodb')
-        thread_local.table = dynamodb_resource.Table('news_articles')
+def _reuse_near_duplicate(article: Dict[str, Any], source: str, title: str, content: str,
+                          thumbnail: Optional[str],
+                          writer: Optional[BatchItemWriter] = None) -> Optional[Dict[str, Any]]:
+    """
+    Store the article with the summary of an already summarized near-duplicate
+    (syndicated or lightly edited copy), linked through `duplicate_of`.
+
+    Returns:
+        The success result if a summary was reused, otherwise None (summarize as usual)
+    """
+    match = find_near_duplicate(content)
+    if match is None:
+        return None
+    original_title, distance = match
+    original = get_aws_resources().get_item(Key={'title': original_title}).get('Item')
+    if not original:
+        return None
+
+    item = _build_article_item(article, source, title, content, thumbnail, original.get('insights'),
+                               original.get('summary'), original.get('generated_title'), original.get('model'))
+    item['duplicate_of'] = original_title
+    result = {
+        'status': 'success',
+        'title': title,
+        'url': article['link'],
+        'message': f"Reused summary of near-duplicate '{original_title}' ({distance} bits apart)",
+        'duplicate_of': original_title
+    }
+    save_article_item(item, article, source, result, writer)
+    return result
+
+
+# Per-article steps shared by every processing engine. Each returns the
+# article's final result when processing stops there, or None to go on.
+
+def _check_url_index(article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Skip before fetching if the URL is already in the idempotency index"""
+    if not article.get('index_checked') and is_article_indexed(article):
+        return {
+            'status': 'skipped',
+            'title': article.get('title', 'Unknown'),
+            'url': article['link'],
+            'message': 'Article already exists (URL index)'
+        }
+    return None
 
-    return thread_local.table
 
+def _check_content(article: Dict[str, Any], source: str, title: str, content: str) -> Optional[Dict[str, Any]]:
+    """Record the extracted content on the article, and reject failed fetches and boilerplate"""
+    article['content'] = content
+    article['source'] = source
+    return check_content_quality(title, content, article['link'])
 
 
+def _article_thumbnail(article: Dict[str, Any], source: str, main_image_url: str) -> Optional[str]:
+    """The feed's thumbnail or the article page's main image, depending on the source"""
+    if ARTICLE_SOURCES[source]['use_feed_thumbnail']:
+        return article.get('thumbnail')
+    return main_image_url
+
+
+def _check_existing_title(article: Dict[str, Any], source: str, title: str, content: str,
+                          thumbnail: Optional[str],
+                          writer: Optional[BatchItemWriter] = None) -> Optional[Dict[str, Any]]:
+    """
+    Skip articles already stored under this title, or store one with the summary
+    of a near-duplicate instead of calling the LLM.
+    """
+    if 'Item' in get_aws_resources().get_item(Key={'title': title}):
+        # Stored before the URL index existed; index it so the next run skips the fetch
+        mark_article_indexed(article, title, source)
+        return {
+            'status': 'skipped',
+            'title': title,
+            'url': article['link'],
+            'message': 'Article already exists'
+        }
+    return _reuse_near_duplicate(article, source, title, content, thumbnail, writer)
+
+
+def _store_summary(article: Dict[str, Any], source: str, title: str, content: str,
+                   thumbnail: Optional[str], llm_output: str, model_used: str, llm: Any,
+                   writer: Optional[BatchItemWriter] = None) -> Dict[str, Any]:
+    """
+    Validate an LLM output and store the summarized article.
+
+    Args:
+        llm: Runnable that produced `llm_output` (its cache entry is dropped if unusable)
+        model_used: Provider that produced `llm_output`
 
+    Returns:
+        The success result, or the parsing error result
+    """
+    fields, parsing_error = _parse_summary_output(llm_output, title, article['link'])
+    if parsing_error:
+        # Don't serve the same unusable output from the LLM cache next time
+        discard_cached_output(llm, model_used, {'content': content})
+        return parsing_error
+    insights, summary, gen_title = fields
+
+    item = _build_article_item(article, source, title, content, thumbnail,
+                               insights, summary, gen_title, model_used)
+    result = {
+        'status': 'success',
+        'title': title,
+        'url': article['link'],
+        'message': 'Article processed successfully',
+        'model': model_used
+    }
+    # Buffered when a writer is given
+    save_article_item(item, article, source, result, writer)
+    register_content(title, content)
+    return result
+
+
+def print_result_progress(result: Dict[str, Any]):
+    """Print a one-line progress marker for a single article result"""
+    if result['status'] == 'success':
+        print(f"✓ {result['title']}")
+    elif result['status'] == 'skipped':
+        print(f"→ Skipped: {result['title']}")
+    elif result['status'] == 'parsing_error':
+        print(f"⚠ Parsing error: {result['title']} - {result['message']}")
+    elif result['status'] == 'rejected':
+        print(f"⊘ Rejected: {result['title']} - {result['message']}")
+    else:
+        print(f"✗ Error: {result['title']} - {result['message']}")
 
 
 def process_single_article_bbc(article: Dict[str, Any], model: str, headers: Dict[str, str], 
-                          runnable, grunnable) -> Dict[str, Any]:
+                          runnable, grunnable, writer: Optional[BatchItemWriter] = None) -> Dict[str, Any]:
     """
     Process a single article - extract content, generate summary, and save to DynamoDB
     
@@ -327,98 +610,52 @@ def process_single_article_bbc(article: Dict[str, Any], model: str, headers: Dic
         headers: Headers for web requests
         runnable: OpenAI runnable instance
         grunnable: Gemini runnable instance
+        writer: Optional write-behind buffer; when given the item is written in a batch
+            and the returned result's `write_status` is updated once it has been
     
     Returns:
         Dictionary with processing result
     """
+    return _process_single_article(article, 'BBC', model, headers, runnable, grunnable, writer)
+
+
+def _process_single_article(article: Dict[str, Any], source: str, model: str, headers: Dict[str, str],
+                            runnable, grunnable, writer: Optional[BatchItemWriter] = None) -> Dict[str, Any]:
+    """Source-agnostic body of `process_single_article_bbc` / `process_single_article_aj`"""
     url = article['link']
-    table = get_aws_resources()
-    
-    try:
-        # 1. Extract article content
-        title, content, _, _ = get_article_content_and_images_bbc(url, headers)
-        article['content'] = content
-        article['source'] = 'BBC'
-
-        # 2. Check if the title already exists in the table
-        response = table.get_item(Key={'title': title})
-        if 'Item' in response:
-            return {
-                'status': 'skipped',
-                'title': title,
-                'url': url,
-                'message': 'Article already exists'
-            }
 
-        # 3. Generate summary using the selected model
-        if model == 'openai':
-            llm_output = runnable.invoke({'content': content})
-        elif model == 'gemini':
-            llm_output = grunnable.invoke({'content': content})
-        else:
+    try:
+        # 0. Skip before fetching if the URL is already in the idempotency index
+        skipped = _check_url_index(article)
+        if skipped:
+            return skipped
+
+        # 1. Extract article content; failed fetches and boilerplate never reach the LLM
+        title, content, main_image_url, _ = ARTICLE_SOURCES[source]['extractor'](url, headers)
+        rejection = _check_content(article, source, title, content)
+        if rejection:
+            return rejection
+
+        # 2. Skip stored titles, or reuse the summary of a near-duplicate story
+        thumbnail = _article_thumbnail(article, source, main_image_url)
+        done = _check_existing_title(article, source, title, content, thumbnail, writer)
+        if done:
+            return done
+
+        # 3. Generate summary using the selected model (retried, failing over to the other model)
+        if model not in ('openai', 'gemini'):
             return {
                 'status': 'error',
                 'title': title,
                 'url': url,
                 'message': f'Unsupported model: {model}'
             }
+        candidates = llm_candidates(model, runnable, grunnable)
+        llm_output, model_used = invoke_with_failover(candidates, {'content': content})
 
-        # 4. Extract structured fields from the LLM response
-        try:
-            insights = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='insights')
-            summary = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='thumbnail_snippet')
-            gen_title = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='title')
-        except Exception as parsing_error:
-            return {
-                'status': 'parsing_error',
-                'title': title,
-                'url': url,
-                'message': f'Error extracting fields from LLM response: {str(parsing_error)}',
-                'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output  # First 500 chars for debugging
-            }
-        
-        # 4a. Validate that all required fields were extracted
-        if not all([insights, summary, gen_title]):
-            missing_fields = []
-            if not insights: missing_fields.append('insights')
-            if not summary: missing_fields.append('thumbnail_snippet')
-            if not gen_title: missing_fields.append('title')
-            
-            return {
-                'status': 'parsing_error',
-                'title': title,
-                'url': url,
-                'message': f'Missing or empty fields: {", ".join(missing_fields)}',
-                'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output,
-                'extracted_data': {
-                    'insights': insights if insights else '',
-                    'summary': summary if summary else '',
-                    'gen_title': gen_title if gen_title else ''
-                }
-            }
-
-        # 5. Prepare item for insertion (with fallback values)
-        item = {
-            'title': title,
-            'url': article.get('link'),
-            'publisheddate': article.get('pubDate'),
-            'thumbnail': article.get('thumbnail'),
-            'content': content,
-            'source': 'BBC',
-            'generated_title': gen_title or title,  # Fallback to original title
-            'summary': summary or content[:500] + "...",  # Fallback to truncated content
-            'insights': insights or "No insights available"  # Fallback message
-        }
-
-        # 6. Insert into DynamoDB
-        table.put_item(Item=item)
-        
-        return {
-            'status': 'success',
-            'title': title,
-            'url': url,
-            'message': 'Article processed successfully'
-        }
+        # 4. Validate the output and insert into DynamoDB
+        return _store_summary(article, source, title, content, thumbnail, llm_output, model_used,
+                              dict(candidates)[model_used], writer)
 
     except Exception as e:
         return {
@@ -428,6 +665,61 @@ def process_single_article_bbc(article: Dict[str, Any], model: str, headers: Dic
             'message': str(e)
         }
 
+
+def _process_articles_sliding_window(articles: List[Dict[str, Any]], process_fn, report_every: int,
+                                     model: str, headers: Dict[str, str], runnable, grunnable,
+                                     max_workers: int,
+                                     writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
+    """
+    Run `process_fn` over `articles`, keeping `max_workers` articles in flight at all
+    times. A finished article frees its slot immediately instead of waiting for the
+    slowest article of a batch.
+    """
+    all_results = []
+    total = len(articles)
+
+    print(f"Processing {total} articles with up to {max_workers} in flight")
+
+    def worker(article):
+        return process_fn(article, model, headers, runnable, grunnable, writer)
+
+    def on_result(article, result):
+        all_results.append(result)
+        print_result_progress(result)
+        if report_every and len(all_results) % report_every == 0 and len(all_results) < total:
+            _print_progress_summary(all_results, total)
+
+    def on_error(article, e):
+        all_results.append({
+            'status': 'error',
+            'title': article.get('title', 'Unknown'),
+            'url': article.get('link', 'Unknown'),
+            'message': f'Future execution error: {str(e)}'
+        })
+        print(f"✗ Future error: {article.get('link', 'Unknown')} - {str(e)}")
+
+    run_sliding_window(
+        articles,
+        worker,
+        max_in_flight=max(1, min(max_workers, total)),
+        on_result=on_result,
+        on_error=on_error
+    )
+
+    return all_results
+
+
+def _print_progress_summary(results: List[Dict[str, Any]], total: int):
+    """Print a running count of outcomes so far"""
+    success_count = sum(1 for r in results if r['status'] == 'success')
+    skipped_count = sum(1 for r in results if r['status'] == 'skipped')
+    rejected_count = sum(1 for r in results if r['status'] == 'rejected')
+    error_count = sum(1 for r in results if r['status'] == 'error')
+
+    print(f"Progress {len(results)}/{total}: {success_count} success, {skipped_count} skipped, "
+          f"{rejected_count} rejected, {error_count} errors")
+
+
 def process_articles_parallel_bbc(articles: List[Dict[str, Any]], 
                             batch_size: int, 
                             model: str, 
@@ -435,19 +727,22 @@ def process_articles_parallel_bbc(articles: List[Dict[str, Any]],
                             runnable=None, 
                             grunnable=None,
                             max_workers: int = 5,
-                            delay_between_batches: float = 2.0) -> List[Dict[str, Any]]:
+                            delay_between_batches: float = 2.0,
+                            writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
     """
-    Process articles in parallel batches
+    Process articles with a sliding window of `max_workers` articles in flight
     
     Args:
         articles: List of article dictionaries
-        batch_size: Number of articles to process in each batch
+        batch_size: Print a running summary after every `batch_size` finished articles
         model: Model to use ('openai' or 'gemini')
         headers: Headers for web requests
         runnable: OpenAI runnable instance (required if model='openai')
         grunnable: Gemini runnable instance (required if model='gemini')
-        max_workers: Maximum number of threads per batch
-        delay_between_batches: Delay in seconds between batches
+        max_workers: Number of articles processed concurrently
+        delay_between_batches: Ignored. Slots are refilled as soon as an article finishes;
+            throttling is the rate limiter's job, not the scheduler's
+        writer: Optional write-behind buffer shared by all workers (flushed by the caller)
     
     Returns:
         List of processing results for all articles
@@ -457,74 +752,11 @@ def process_articles_parallel_bbc(articles: List[Dict[str, Any]],
         raise ValueError("runnable is required when model='openai'")
     if model == 'gemini' and grunnable is None:
         raise ValueError("grunnable is required when model='gemini'")
-    
-    # Split articles into batches
-    batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
-    all_results = []
-    
-    print(f"Processing {len(articles)} articles in {len(batches)} batches of {batch_size}")
-    
-    for batch_idx, batch in enumerate(batches, 1):
-        print(f"\nProcessing batch {batch_idx}/{len(batches)} ({len(batch)} articles)...")
-        
-        batch_results = []
-        
-        # Process batch in parallel
-        with ThreadPoolExecutor(max_workers=min(max_workers, len(batch))) as executor:
-            # Submit all tasks in the batch
-            future_to_article = {
-                executor.submit(
-                    process_single_article_bbc, 
-                    article, 
-                    model, 
-                    headers, 
-                    runnable, 
-                    grunnable
-                ): article for article in batch
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_article):
-                article = future_to_article[future]
-                try:
-                    result = future.result()
-                    batch_results.append(result)
-                    
-                    # Print progress
-                    if result['status'] == 'success':
-                        print(f"✓ {result['title']}")
-                    elif result['status'] == 'skipped':
-                        print(f"→ Skipped: {result['title']}")
-                    elif result['status'] == 'parsing_error':
-                        print(f"⚠ Parsing error: {result['title']} - {result['message']}")
-                    else:
-                        print(f"✗ Error: {result['title']} - {result['message']}")
-                        
-                except Exception as e:
-                    error_result = {
-                        'status': 'error',
-                        'title': article.get('title', 'Unknown'),
-                        'url': article.get('link', 'Unknown'),
-                        'message': f'Future execution error: {str(e)}'
-                    }
-                    batch_results.append(error_result)
-                    print(f"✗ Future error: {article.get('link', 'Unknown')} - {str(e)}")
-        
-        all_results.extend(batch_results)
-        
-        # Print batch summary
-        success_count = sum(1 for r in batch_results if r['status'] == 'success')
-        skipped_count = sum(1 for r in batch_results if r['status'] == 'skipped')
-        error_count = sum(1 for r in batch_results if r['status'] == 'error')
-        
-        print(f"Batch {batch_idx} complete: {success_count} success, {skipped_count} skipped, {error_count} errors")
-        
-        # Delay between batches (except for the last batch)
-        if batch_idx < len(batches):
-            print(f"Waiting {delay_between_batches}s before next batch...")
-            time.sleep(delay_between_batches)
-    
-    return all_results
+
+    return _process_articles_sliding_window(
+        articles, process_single_article_bbc, batch_size, model, headers, runnable, grunnable, max_workers,
+        writer
+    )
 
 def print_final_summary(results: List[Dict[str, Any]]):
     """Print a summary of all processing results"""
@@ -532,15 +764,22 @@ def print_final_summary(results: List[Dict[str, Any]]):
     skipped_count = sum(1 for r in results if r['status'] == 'skipped')
     error_count = sum(1 for r in results if r['status'] == 'error')
     parsing_error_count = sum(1 for r in results if r['status'] == 'parsing_error')
+    rejected_count = sum(1 for r in results if r['status'] == 'rejected')
+    reused_count = sum(1 for r in results if r.get('duplicate_of'))
+    models = Counter(r['model'] for r in results if r.get('model'))
     
     print(f"\n{'='*50}")
     print(f"FINAL SUMMARY")
     print(f"{'='*50}")
     print(f"Total articles: {len(results)}")
     print(f"Successfully processed: {success_count}")
+    print(f"  of which reused a near-duplicate's summary: {reused_count}")
     print(f"Skipped (already exist): {skipped_count}")
     print(f"General errors: {error_count}")
     print(f"Parsing errors: {parsing_error_count}")
+    print(f"Rejected (low-quality content): {rejected_count}")
+    if models:
+        print(f"Summarized by model: {', '.join(f'{m}={n}' for m, n in sorted(models.items()))}")
     
     if error_count > 0:
         print(f"\nGeneral errors:")
@@ -556,170 +795,213 @@ def print_final_summary(results: List[Dict[str, Any]]):
                 if 'extracted_data' in result:
                     print(f"    Extracted data: {result['extracted_data']}")
 
+    if rejected_count > 0:
+        print(f"\nRejected before summarization:")
+        for result in results:
+            if result['status'] == 'rejected':
+                print(f"  - {result['url']}: {result['message']}")
+
 
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta,timezone
 import requests
 
 
+_SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+_SITEMAP_NEWS_NS = {
+    'news': 'http://www.google.com/schemas/sitemap-news/0.9'
+}
+
+
+def _parse_aljazeera_sitemap_url(url_el) -> Optional[Tuple[datetime, Dict[str, Any]]]:
+    """Turn one sitemap <url> element into (pub_date, article), or None if it isn't a usable news article"""
+    loc_el = url_el.find(f'{_SITEMAP_NS}loc')
+    pub_el = url_el.find('news:news/news:publication_date', _SITEMAP_NEWS_NS)
+    title_el = url_el.find('news:news/news:title', _SITEMAP_NEWS_NS)
+
+    if loc_el is None or pub_el is None or title_el is None:
+        return None
+
+    url = loc_el.text.strip()
+    if "/news/" not in url or "/liveblog/" in url:
+        return None
+
+    try:
+        pub_date = datetime.fromisoformat(pub_el.text.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+    return pub_date, {
+        'title': title_el.text.strip(),
+        'link': url,
+        'canonical_url': canonicalize_url(url),
+        'pubDate': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
 def parse_aljazeera_news_sitemap(xml_content, days_back=20):
     """
     Parse Al Jazeera's sitemap and return news articles published within `days_back` days.
     """
-    ns = {
-        'news': 'http://www.google.com/schemas/sitemap-news/0.9'
-    }
-
     root = ET.fromstring(xml_content)
     articles = []
     
     today = datetime.now(timezone.utc)
     date_limit = today - timedelta(days=days_back)
 
-    for url_el in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-        loc_el = url_el.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-        pub_el = url_el.find('news:news/news:publication_date', ns)
-        title_el = url_el.find('news:news/news:title', ns)
+    for url_el in root.findall(f'.//{_SITEMAP_NS}url'):
+        parsed = _parse_aljazeera_sitemap_url(url_el)
+        if parsed is not None and parsed[0] >= date_limit:
+            articles.append(parsed[1])
 
-        if loc_el is None or pub_el is None or title_el is None:
-            continue
+    return articles
 
-        url = loc_el.text.strip()
-        if "/news/" not in url or "/liveblog/" in url:
-            continue
 
-        try:
-            pub_date = datetime.fromisoformat(pub_el.text.strip().replace("Z", "+00:00"))
-        except ValueError:
-            continue
+def iter_aljazeera_news_sitemap(source, days_back=20, stop_at_cutoff=False) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `parse_aljazeera_news_sitemap`: yields each article as soon as its <url> is parsed.
 
-        if pub_date >= date_limit:
-            articles.append({
-                'title': title_el.text.strip(),
-                'link': url,
-                'pubDate': pub_date.strftime('%Y-%m-%d %H:%M:%S'),
-            })
+    Args:
+        source: Raw bytes or a binary file-like object
+        days_back: Only yield articles published within this many days
+        stop_at_cutoff: Stop reading at the first entry older than the cutoff.
+            Only correct for sitemaps sorted newest first.
+    """
+    date_limit = datetime.now(timezone.utc) - timedelta(days=days_back)
 
-    return articles
+    for url_el in _iterparse_records(source, f'{_SITEMAP_NS}url'):
+        parsed = _parse_aljazeera_sitemap_url(url_el)
+        if parsed is None:
+            continue
+        pub_date, article = parsed
+        if pub_date >= date_limit:
+            yield article
+        elif stop_at_cutoff:
+            return
 
 
 import requests
 from bs4 import BeautifulSoup
 import time
 
-def get_article_content_and_images_aj(url, headers):
-    """
-    Fetches the title, content, main image, and date of a single Al Jazeera article
-    
-    Args:
-        url (str): Article URL
-        headers (dict): Request headers
-        
-    Returns:
-        tuple: (title, content_string, main_image_url, publication_date)
-    """
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+def _aj_image_url(img) -> Optional[str]:
+    img_url = _image_src(img)
+    if img_url:
+        # Handle relative URLs
+        if img_url.startswith('//'):
+            img_url = 'https:' + img_url
+        elif img_url.startswith('/'):
+            img_url = 'https://www.aljazeera.com' + img_url
+
+        # Prefer high-quality images (look for wp-content which Al Jazeera uses)
+        if 'wp-content' in img_url or img_url.startswith('https://'):
+            return img_url
+    return None
+
+
+def _aj_paragraphs(elements) -> List[str]:
+    content_paragraphs = []
+    for element in elements:
+        # Skip elements that are likely ads or navigation
+        if (element.find_parent(['aside', 'nav', '.more-on', '.article-related-list']) or
+            'newsletter' in element.get('class', []) or
+            'advertisement' in element.get_text().lower()):
+            continue
 
-        # EXTRACT TITLE
-        title = ""
-        title_selectors = [
+        text = element.get_text(strip=True)
+        if text and len(text) > 20:  # Filter out very short text
+            content_paragraphs.append(text)
+    return content_paragraphs
+
+
+AJ_EXTRACTION_PLAN = ExtractionPlan(name='AJ', regions=_ARTICLE_REGIONS, fields={
+    'title': {
+        'selectors': [
             'header.article-header h1',  # Al Jazeera main title
             'h1',  # Fallback
-        ]
-        
-        for selector in title_selectors:
-            title_element = soup.select_one(selector)
-            if title_element:
-                title = title_element.get_text(strip=True)
-                break
-        
-        if not title:
-            title = "Title not found"
-
-        # EXTRACT DATE
-        publication_date = ""
-        date_selectors = [
+        ],
+        'value': _element_text,
+    },
+    'date': {
+        'selectors': [
             '.article-dates .date-simple span[aria-hidden="true"]',  # Al Jazeera date format
             '.date-simple span[aria-hidden="true"]',  # Alternative date selector
             'time[datetime]',  # Generic time with datetime attribute
             '.article-dates',  # Broader date container
-        ]
-        
-        for selector in date_selectors:
-            date_element = soup.select_one(selector)
-            if date_element:
-                # Try to get the datetime attribute first, then text content
-                publication_date = (date_element.get('datetime') or 
-                                  date_element.get_text(strip=True))
-                break
-        
-        if not publication_date:
-            publication_date = "Date not found"
-
-        # EXTRACT CONTENT
-        content_selectors = [
+        ],
+        'value': _element_date,
+    },
+    'content': {
+        'selectors': [
             '.wysiwyg.wysiwyg--all-content p',  # Al Jazeera main content paragraphs
             '.wysiwyg p',  # Alternative content selector
             'article p',  # Generic article paragraphs
             '.article-content p',  # Another possible content selector
-        ]
-
-        content_paragraphs = []
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                for element in elements:
-                    # Skip elements that are likely ads or navigation
-                    if (element.find_parent(['aside', 'nav', '.more-on', '.article-related-list']) or
-                        'newsletter' in element.get('class', []) or
-                        'advertisement' in element.get_text().lower()):
-                        continue
-                    
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 20:  # Filter out very short text
-                        content_paragraphs.append(text)
-                break
-
-        # EXTRACT MAIN IMAGE
-        main_image_url = ""
-        image_selectors = [
+        ],
+        'value': _aj_paragraphs,
+        'many': True,
+    },
+    'image': {
+        'selectors': [
             'figure.article-featured-image img',  # Al Jazeera featured image
             '.article-featured-image img',  # Alternative featured image
             'figure img',  # Generic figure image
             '.responsive-image img',  # Responsive image container
-        ]
-
-        for selector in image_selectors:
-            img = soup.select_one(selector)
-            if img:
-                img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                if img_url:
-                    # Handle relative URLs
-                    if img_url.startswith('//'):
-                        img_url = 'https:' + img_url
-                    elif img_url.startswith('/'):
-                        img_url = 'https://www.aljazeera.com' + img_url
-                    
-                    # Prefer high-quality images (look for wp-content which Al Jazeera uses)
-                    if 'wp-content' in img_url or img_url.startswith('https://'):
-                        main_image_url = img_url
-                        break
-
-        content = '\n\n'.join(content_paragraphs) if content_paragraphs else "Content could not be extracted"
-
-        return title, content, main_image_url, publication_date
+        ],
+        'value': _aj_image_url,
+    },
+})
+
+
+def extract_article_aj(html, backend: Optional[str] = None) -> Tuple[str, str, str, str]:
+    """
+    Extracts the title, content, main image, and date from an Al Jazeera article page
+
+    All fields are resolved in a single pass over the article regions of the page
+    (see AJ_EXTRACTION_PLAN).
+
+    Args:
+        html (bytes | str): Raw article HTML
+        backend (str): HTML parser backend (see html_backends; default HTML_PARSER_BACKEND)
+
+    Returns:
+        tuple: (title, content_string, main_image_url, publication_date)
+    """
+    fields = AJ_EXTRACTION_PLAN.extract(html, backend)
+
+    title = fields['title'] or "Title not found"
+    publication_date = fields['date'] or "Date not found"
+    main_image_url = fields['image'] or ""
+    content_paragraphs = fields['content']
+
+    content = '\n\n'.join(content_paragraphs) if content_paragraphs else "Content could not be extracted"
+
+    return title, content, main_image_url, publication_date
+
+
+def get_article_content_and_images_aj(url, headers):
+    """
+    Fetches the title, content, main image, and date of a single Al Jazeera article
+    
+    Args:
+        url (str): Article URL
+        headers (dict): Request headers
+        
+    Returns:
+        tuple: (title, content_string, main_image_url, publication_date)
+    """
+    try:
+        html = fetch_article_html(url, headers, ARTICLE_SOURCES['AJ']['stop_markers'])
+        return extract_article('AJ', html)
 
     except Exception as e:
-        return "Error extracting title", f"Error fetching content: {str(e)}", "", "Date not found"
+        return _failed_extraction(e)
     
 
 
 def process_single_article_aj(article: Dict[str, Any], model: str, headers: Dict[str, str], 
-                          runnable, grunnable) -> Dict[str, Any]:
+                          runnable, grunnable, writer: Optional[BatchItemWriter] = None) -> Dict[str, Any]:
     """
     Process a single article - extract content, generate summary, and save to DynamoDB
     
@@ -729,106 +1011,13 @@ def process_single_article_aj(article: Dict[str, Any], model: str, headers: Dict
         headers: Headers for web requests
         runnable: OpenAI runnable instance
         grunnable: Gemini runnable instance
+        writer: Optional write-behind buffer; when given the item is written in a batch
+            and the returned result's `write_status` is updated once it has been
     
     Returns:
         Dictionary with processing result
     """
-    url = article['link']
-    table = get_aws_resources()
-    
-    try:
-        # 1. Extract article content
-        title, content, main_image_url, _ = get_article_content_and_images_aj(url, headers)
-        article['content'] = content
-        article['source'] = 'BBC'
-
-        # 2. Check if the title already exists in the table
-        response = table.get_item(Key={'title': title})
-        if 'Item' in response:
-            return {
-                'status': 'skipped',
-                'title': title,
-                'url': url,
-                'message': 'Article already exists'
-            }
-
-        # 3. Generate summary using the selected model
-        if model == 'openai':
-            llm_output = runnable.invoke({'content': content})
-        elif model == 'gemini':
-            llm_output = grunnable.invoke({'content': content})
-        else:
-            return {
-                'status': 'error',
-                'title': title,
-                'url': url,
-                'message': f'Unsupported model: {model}'
-            }
-
-        # 4. Extract structured fields from the LLM response
-        try:
-            insights = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='insights')
-            summary = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='thumbnail_snippet')
-            gen_title = _extract_text_between_last_tag_pair(xml_text=llm_output, tag='title')
-        except Exception as parsing_error:
-            return {
-                'status': 'parsing_error',
-                'title': title,
-                'url': url,
-                'message': f'Error extracting fields from LLM response: {str(parsing_error)}',
-                'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output  # First 500 chars for debugging
-            }
-        
-        # 4a. Validate that all required fields were extracted
-        if not all([insights, summary, gen_title]):
-            missing_fields = []
-            if not insights: missing_fields.append('insights')
-            if not summary: missing_fields.append('thumbnail_snippet')
-            if not gen_title: missing_fields.append('title')
-            
-            return {
-                'status': 'parsing_error',
-                'title': title,
-                'url': url,
-                'message': f'Missing or empty fields: {", ".join(missing_fields)}',
-                'llm_output': llm_output[:500] + "..." if len(llm_output) > 500 else llm_output,
-                'extracted_data': {
-                    'insights': insights if insights else '',
-                    'summary': summary if summary else '',
-                    'gen_title': gen_title if gen_title else ''
-                }
-            }
-
-        # 5. Prepare item for insertion (with fallback values)
-        item = {
-            'title': title,
-            'url': article.get('link'),
-            'publisheddate': article.get('pubDate'),
-            'thumbnail': main_image_url,
-            'content': content,
-            'source': 'AJ',
-            'generated_title': gen_title or title,  # Fallback to original title
-            'summary': summary or content[:500] + "...",  # Fallback to truncated content
-            'insights': insights or "No insights available"  # Fallback message
-        }
-
-        # 6. Insert into DynamoDB
-        table.put_item(Item=item)
-        
-        return {
-            'status': 'success',
-            'title': title,
-            'url': url,
-            'message': 'Article processed successfully'
-        }
-
-    except Exception as e:
-        return {
-            'status': 'error',
-            'title': article.get('title', 'Unknown'),
-            'url': url,
-            'message': str(e)
-        }
+    return _process_single_article(article, 'AJ', model, headers, runnable, grunnable, writer)
 
 def process_articles_parallel_aj(articles: List[Dict[str, Any]], 
                             batch_size: int, 
@@ -837,19 +1026,22 @@ def process_articles_parallel_aj(articles: List[Dict[str, Any]],
                             runnable=None, 
                             grunnable=None,
                             max_workers: int = 5,
-                            delay_between_batches: float = 2.0) -> List[Dict[str, Any]]:
+                            delay_between_batches: float = 2.0,
+                            writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
     """
-    Process articles in parallel batches
+    Process articles with a sliding window of `max_workers` articles in flight
     
     Args:
         articles: List of article dictionaries
-        batch_size: Number of articles to process in each batch
+        batch_size: Print a running summary after every `batch_size` finished articles
         model: Model to use ('openai' or 'gemini')
         headers: Headers for web requests
         runnable: OpenAI runnable instance (required if model='openai')
         grunnable: Gemini runnable instance (required if model='gemini')
-        max_workers: Maximum number of threads per batch
-        delay_between_batches: Delay in seconds between batches
+        max_workers: Number of articles processed concurrently
+        delay_between_batches: Ignored. Slots are refilled as soon as an article finishes;
+            throttling is the rate limiter's job, not the scheduler's
+        writer: Optional write-behind buffer shared by all workers (flushed by the caller)
     
     Returns:
         List of processing results for all articles
@@ -859,72 +1051,120 @@ def process_articles_parallel_aj(articles: List[Dict[str, Any]],
         raise ValueError("runnable is required when model='openai'")
     if model == 'gemini' and grunnable is None:
         raise ValueError("grunnable is required when model='gemini'")
-    
-    # Split articles into batches
-    batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
-    all_results = []
-    
-    print(f"Processing {len(articles)} articles in {len(batches)} batches of {batch_size}")
-    
-    for batch_idx, batch in enumerate(batches, 1):
-        print(f"\nProcessing batch {batch_idx}/{len(batches)} ({len(batch)} articles)...")
-        
-        batch_results = []
-        
-        # Process batch in parallel
-        with ThreadPoolExecutor(max_workers=min(max_workers, len(batch))) as executor:
-            # Submit all tasks in the batch
-            future_to_article = {
-                executor.submit(
-                    process_single_article_aj, 
-                    article, 
-                    model, 
-                    headers, 
-                    runnable, 
-                    grunnable
-                ): article for article in batch
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_article):
-                article = future_to_article[future]
-                try:
-                    result = future.result()
-                    batch_results.append(result)
-                    
-                    # Print progress
-                    if result['status'] == 'success':
-                        print(f"✓ {result['title']}")
-                    elif result['status'] == 'skipped':
-                        print(f"→ Skipped: {result['title']}")
-                    elif result['status'] == 'parsing_error':
-                        print(f"⚠ Parsing error: {result['title']} - {result['message']}")
-                    else:
-                        print(f"✗ Error: {result['title']} - {result['message']}")
-                        
-                except Exception as e:
-                    error_result = {
-                        'status': 'error',
-                        'title': article.get('title', 'Unknown'),
-                        'url': article.get('link', 'Unknown'),
-                        'message': f'Future execution error: {str(e)}'
-                    }
-                    batch_results.append(error_result)
-                    print(f"✗ Future error: {article.get('link', 'Unknown')} - {str(e)}")
-        
-        all_results.extend(batch_results)
-        
-        # Print batch summary
-        success_count = sum(1 for r in batch_results if r['status'] == 'success')
-        skipped_count = sum(1 for r in batch_results if r['status'] == 'skipped')
-        error_count = sum(1 for r in batch_results if r['status'] == 'error')
-        
-        print(f"Batch {batch_idx} complete: {success_count} success, {skipped_count} skipped, {error_count} errors")
-        
-        # Delay between batches (except for the last batch)
-        if batch_idx < len(batches):
-            print(f"Waiting {delay_between_batches}s before next batch...")
-            time.sleep(delay_between_batches)
-    
-    return all_results
 
+    return _process_articles_sliding_window(
+        articles, process_single_article_aj, batch_size, model, headers, runnable, grunnable, max_workers,
+        writer
+    )
+
+
+# Per-source settings used by the source-agnostic processing engines.
+# BBC thumbnails come from the RSS feed, Al Jazeera ones from the article page.
+# Everything the extractors read sits inside <main>, so nothing after it is kept
+# (BBC's trailing __NEXT_DATA__ JSON alone can be most of the page). A tail of up
+# to HTTP_DRAIN_BYTES is still read and discarded so the kept-alive connection is
+# reused; only a longer one is cut off, trading its download for a new TCP/TLS
+# handshake on the next fetch from that host. Set stop_markers to () to always
+# read whole pages.
+ARTICLE_SOURCES = {
+    'BBC': {'extractor': get_article_content_and_images_bbc, 'parser': extract_article_bbc,
+            'processor': process_single_article_bbc, 'use_feed_thumbnail': True,
+            'stop_markers': (b'</main>',)},
+    'AJ': {'extractor': get_article_content_and_images_aj, 'parser': extract_article_aj,
+           'processor': process_single_article_aj, 'use_feed_thumbnail': False,
+           'stop_markers': (b'</main>',)},
+}
+
+
+def extract_article(source: str, html) -> Tuple[str, str, str, str]:
+    """
+    Run the source's parser on raw article HTML, in the extraction process pool
+    when one is configured (see extraction_pool) and in the calling thread otherwise.
+
+    Returns:
+        tuple: (title, content_string, main_image_url, publication_date)
+    """
+    pool = get_extraction_pool()
+    if pool is not None:
+        return pool.extract(source, html)
+    return ARTICLE_SOURCES[source]['parser'](html)
+
+
+def process_articles_all_sources(articles_by_source: Dict[str, List[Dict[str, Any]]],
+                                 model: str,
+                                 headers_by_source: Dict[str, Dict[str, str]],
+                                 runnable=None,
+                                 grunnable=None,
+                                 max_workers: int = 10,
+                                 weights: Optional[Dict[str, int]] = None,
+                                 report_every: int = 100,
+                                 writer: Optional[BatchItemWriter] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Process the articles of every source under one shared worker budget
+
+    Articles from all sources are interleaved by weight (smooth weighted round-robin)
+    into a single sliding window, so every source makes progress from the start and
+    a slow source can't starve the others before the Lambda times out.
+
+    Args:
+        articles_by_source: Mapping of source key (see ARTICLE_SOURCES) -> articles
+        model: Model to use ('openai' or 'gemini')
+        headers_by_source: Request headers per source
+        runnable: OpenAI runnable instance (required if model='openai')
+        grunnable: Gemini runnable instance (required if model='gemini')
+        max_workers: Articles in flight across all sources
+        weights: Relative share of the workers per source (default equal shares)
+        report_every: Print a running summary after this many finished articles
+        writer: Optional write-behind buffer shared by all workers (flushed by the caller)
+
+    Returns:
+        Mapping of source -> list of processing results
+    """
+    if model == 'openai' and runnable is None:
+        raise ValueError("runnable is required when model='openai'")
+    if model == 'gemini' and grunnable is None:
+        raise ValueError("grunnable is required when model='gemini'")
+    unknown = set(articles_by_source) - set(ARTICLE_SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+
+    results_by_source: Dict[str, List[Dict[str, Any]]] = {source: [] for source in articles_by_source}
+    all_results = []
+    total = sum(len(articles) for articles in articles_by_source.values())
+
+    counts = ', '.join(f"{source}: {len(articles)}" for source, articles in articles_by_source.items())
+    print(f"Processing {total} articles ({counts}) with up to {max_workers} in flight")
+
+    def worker(work):
+        source, article = work
+        process_fn = ARTICLE_SOURCES[source]['processor']
+        return process_fn(article, model, headers_by_source[source], runnable, grunnable, writer)
+
+    def on_result(work, result):
+        results_by_source[work[0]].append(result)
+        all_results.append(result)
+        print_result_progress(result)
+        if report_every and len(all_results) % report_every == 0 and len(all_results) < total:
+            _print_progress_summary(all_results, total)
+
+    def on_error(work, e):
+        source, article = work
+        result = {
+            'status': 'error',
+            'title': article.get('title', 'Unknown'),
+            'url': article.get('link', 'Unknown'),
+            'message': f'Future execution error: {str(e)}'
+        }
+        results_by_source[source].append(result)
+        all_results.append(result)
+        print(f"✗ Future error: {article.get('link', 'Unknown')} - {str(e)}")
+
+    run_sliding_window(
+        interleave_weighted(articles_by_source, weights),
+        worker,
+        max_in_flight=max(1, min(max_workers, total)),
+        on_result=on_result,
+        on_error=on_error
+    )
+
+    return results_by_source
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# `unbiasedupdates` is imported from the repository root, as in the Lambda package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+from unbiasedupdates.extraction import ExtractionPlan
+from unbiasedupdates.html_backends import available_backends
+
+import pytest
+
+
+def _text(element):
+    text = element.get_text(strip=True) if hasattr(element, 'get_text') else element.text(strip=True)
+    return text or None
+
+
+def _plan():
+    return ExtractionPlan(adapt_after=3, fields={
+        'title': {'selectors': ['header.article-header h1', 'h1'], 'value': _text},
+    })
+
+
+PLAIN_PAGE = '<html><body><main><h1>Plain {}</h1></main></body></html>'
+PROMO_PAGE = ('<html><body><main><div class="promo"><h1>Newsletter promo</h1></div>'
+              '<header class="article-header"><h1>Real headline</h1></header></main></body></html>')
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_usual_winner_never_preempts_higher_priority_selector(backend):
+    plan = _plan()
+    for i in range(4):
+        assert plan.extract(PLAIN_PAGE.format(i), backend)['title'] == f'Plain {i}'
+    assert plan.stats()['fields']['title']['wins'] == {'h1': 4}
+
+    assert plan.extract(PROMO_PAGE, backend)['title'] == 'Real headline'
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_pruned_selectors_fall_back_to_full_list(backend):
+    plan = _plan()
+    for i in range(4):
+        assert plan.extract(PROMO_PAGE, backend)['title'] == 'Real headline'
+    assert plan.stats()['fields']['title']['last_evaluated'] == 'header.article-header h1'
+
+    # Only the pruned-away fallback matches this page
+    assert plan.extract(PLAIN_PAGE.format('x'), backend)['title'] == 'Plain x'
+    assert plan.stats()['fields']['title']['fallbacks'] == 1
+
+
+def _region_plan():
+    return ExtractionPlan(regions=['main'], fields={
+        'title': {'selectors': ['main h1', 'h1'], 'value': _text},
+        'image': {'selectors': ['figure.featured img', 'figure img'],
+                  'value': lambda img: img.get('src') if hasattr(img, 'get') else img.attributes.get('src')},
+    })
+
+
+INSIDE_PAGE = ('<html><body><nav>menu</nav><main><h1>Story</h1><figure class="featured"><img src="lead.jpg"></figure>'
+               '</main></body></html>')
+OUTSIDE_PAGE = ('<html><body><figure class="featured"><img src="lead.jpg"></figure><main><h1>Story</h1>'
+                '<figure><img src="inline.jpg"></figure></main></body></html>')
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_region_parse_used_when_every_field_matches_first_selector(backend):
+    plan = _region_plan()
+    assert plan.extract(INSIDE_PAGE, backend) == {'title': 'Story', 'image': 'lead.jpg'}
+    if backend != 'selectolax':
+        assert plan.stats()['restricted_parses'] == 1
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_field_outside_regions_falls_back_to_full_parse(backend):
+    plan = _region_plan()
+    # Inside <main> only the lower-ranked 'figure img' matches; the featured image is above it
+    assert plan.extract(OUTSIDE_PAGE, backend) == {'title': 'Story', 'image': 'lead.jpg'}
+    assert plan.stats()['restricted_parses'] == 0
@@ -0,0 +1,14 @@
+from unbiasedupdates.extraction_pool import available_cpus, configure_extraction_pool
+
+import pytest
+
+
+@pytest.mark.parametrize('memory, cpus', [('512', 1), ('1769', 1), ('3008', 1), ('3538', 2), ('10240', 5)])
+def test_lambda_cpus_follow_memory(monkeypatch, memory, cpus):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_MEMORY_SIZE', memory)
+    assert available_cpus() == cpus
+
+
+def test_small_lambda_parses_in_thread(monkeypatch):
+    monkeypatch.setenv('AWS_LAMBDA_FUNCTION_MEMORY_SIZE', '512')
+    assert configure_extraction_pool() is None
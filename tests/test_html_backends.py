@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from unbiasedupdates.html_backends import available_backends, compare_backends
+from unbiasedupdates.utils import extract_article_aj, extract_article_bbc
+
+import pytest
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+# Output of the original per-field cascade (html.parser, every selector tried
+# in order) on each saved page
+EXPECTED = json.loads((FIXTURES / 'expected_extraction.json').read_text(encoding='utf-8'))
+EXTRACTORS = {'bbc': extract_article_bbc, 'aj': extract_article_aj}
+
+
+def _pages(prefix):
+    return {name: (FIXTURES / f'{name}.html').read_bytes() for name in EXPECTED if name.startswith(prefix)}
+
+
+@pytest.mark.parametrize('prefix', sorted(EXTRACTORS))
+def test_backends_agree(prefix):
+    # Several rounds, so later ones run with the plans' pruned selector lists
+    for _ in range(4):
+        assert compare_backends(_pages(prefix), EXTRACTORS[prefix]) == {}
+
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('prefix', sorted(EXTRACTORS))
+def test_matches_original_cascade(prefix, backend):
+    for _ in range(4):
+        for name, html in _pages(prefix).items():
+            assert list(EXTRACTORS[prefix](html, backend=backend)) == EXPECTED[name], name
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('langchain_openai')
+pytest.importorskip('langchain_google_genai')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_KEYS_SCRIPT = """
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_openai import ChatOpenAI
+from unbiasedupdates.llm_cache import llm_cache_key
+from unbiasedupdates.prompts import SUMMARY_GEN_SYS_TEMP
+from unbiasedupdates.utils import gemini_runnable, lg_runnable
+
+runnable = lg_runnable(llm=ChatOpenAI(model='gpt-4o', api_key='sk-test', max_retries=0),
+                       system_message=SUMMARY_GEN_SYS_TEMP)
+grunnable = gemini_runnable(ChatGoogleGenerativeAI(model='gemini-2.5-flash', google_api_key='test',
+                                                   max_retries=0),
+                            template=SUMMARY_GEN_SYS_TEMP)
+print(llm_cache_key(runnable, 'openai', {'content': 'Some article text'}))
+print(llm_cache_key(grunnable, 'gemini', {'content': 'Some article text'}))
+"""
+
+
+def _keys_in_fresh_process():
+    output = subprocess.run([sys.executable, '-c', _KEYS_SCRIPT], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return output.split()
+
+
+def test_cache_keys_are_stable_across_processes():
+    first = _keys_in_fresh_process()
+    second = _keys_in_fresh_process()
+    assert len(first) == 2
+    assert first == second
+    assert first[0] != first[1]
+
+
+def test_fingerprint_tracks_prompt_and_generation_parameters():
+    from langchain_openai import ChatOpenAI
+    from unbiasedupdates.llm_cache import llm_fingerprint
+    from unbiasedupdates.utils import lg_runnable
+
+    base = lg_runnable(llm=ChatOpenAI(model='gpt-4o', api_key='sk-test'), system_message='Summarize {content}')
+    same = lg_runnable(llm=ChatOpenAI(model='gpt-4o', api_key='sk-other'), system_message='Summarize {content}')
+    other_prompt = lg_runnable(llm=ChatOpenAI(model='gpt-4o', api_key='sk-test'), system_message='Shorten {content}')
+    other_params = lg_runnable(llm=ChatOpenAI(model='gpt-4o', api_key='sk-test', temperature=0.1),
+                               system_message='Summarize {content}')
+
+    assert llm_fingerprint(base) == llm_fingerprint(same)
+    assert llm_fingerprint(base) != llm_fingerprint(other_prompt)
+    assert llm_fingerprint(base) != llm_fingerprint(other_params)
@@ -0,0 +1,92 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from unbiasedupdates import near_duplicates
+from unbiasedupdates.near_duplicates import NearDuplicateIndex, _band_keys, _entry, simhash
+
+import pytest
+
+TABLE = 'news_simhash_bands'
+STORY = ("The central bank raised interest rates by a quarter point on Wednesday, "
+         "citing persistent inflation and a strong labour market across the country.")
+
+
+class FakeTable:
+    def __init__(self, dynamodb):
+        self.dynamodb = dynamodb
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues):
+        assert UpdateExpression == 'ADD entries :e SET expires_at = :x'
+        item = self.dynamodb.items.setdefault(Key['band_key'], {'band_key': Key['band_key'], 'entries': set()})
+        item['entries'] |= ExpressionAttributeValues[':e']
+        item['expires_at'] = ExpressionAttributeValues[':x']
+
+
+class FakeDynamoDB:
+    """Band items by key; batch_get_item enforces DynamoDB's 100-key limit"""
+
+    def __init__(self):
+        self.items = {}
+        self.requested = []
+
+    def Table(self, name):
+        assert name == TABLE
+        return FakeTable(self)
+
+    def batch_get_item(self, RequestItems):
+        keys = [key['band_key'] for key in RequestItems[TABLE]['Keys']]
+        assert len(keys) <= 100
+        self.requested.append(keys)
+        return {'Responses': {TABLE: [self.items[key] for key in keys if key in self.items]}}
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    fake = FakeDynamoDB()
+    monkeypatch.setattr(near_duplicates, '_get_dynamodb_resource', lambda: fake)
+    return fake
+
+
+def _flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_memory_index_finds_close_fingerprints_only():
+    index = NearDuplicateIndex(table_name=None, max_distance=3)
+    fingerprint = simhash(STORY)
+    index.add('Rates rise', fingerprint)
+
+    assert index.find(fingerprint) == ('Rates rise', 0)
+    assert index.find(_flip(fingerprint, 1, 20, 40)) == ('Rates rise', 3)
+    assert index.find(_flip(fingerprint, 1, 10, 20, 30, 40)) is None
+
+
+def test_stored_bands_are_found_by_another_container(dynamodb):
+    NearDuplicateIndex(window_days=7).add('Rates rise', simhash(STORY))
+
+    # Today's band items only, each with a TTL past the lookup window
+    today = datetime.now(timezone.utc).date().isoformat()
+    assert len(dynamodb.items) == 8
+    assert all(key.endswith(today) for key in dynamodb.items)
+    assert all(item['expires_at'] > time.time() + 7 * 86400 for item in dynamodb.items.values())
+
+    assert NearDuplicateIndex(window_days=7).find(_flip(simhash(STORY), 5, 50)) == ('Rates rise', 2)
+    # One read covering every band of every day in the window
+    assert len(dynamodb.requested) == 1 and len(dynamodb.requested[0]) == 8 * 7
+
+
+def test_articles_older_than_the_window_are_not_compared(dynamodb):
+    fingerprint = simhash(STORY)
+    old_day = (datetime.now(timezone.utc) - timedelta(days=10)).date().isoformat()
+    for key in _band_keys(fingerprint, old_day):
+        dynamodb.items[key] = {'band_key': key, 'entries': {_entry('Old story', fingerprint)}}
+
+    assert NearDuplicateIndex(window_days=7).find(fingerprint) is None
+    assert NearDuplicateIndex(window_days=12).find(fingerprint) == ('Old story', 0)
+
+
+def test_window_must_fit_one_batch_get():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(table_name=None, window_days=13)
@@ -0,0 +1,50 @@
+from unbiasedupdates.quality import check_content_quality
+
+LAWSUIT_STORY = '\n\n'.join([
+    "A group of authors has filed a copyright lawsuit against a technology company, "
+    "accusing it of training its software on their books without permission. All rights "
+    "reserved notices in the novels were ignored, the complaint says.",
+    "The company said it would defend itself, arguing that its use of the material was "
+    "fair and that the lawsuit misunderstood how the technology works. Lawyers for the "
+    "authors said the case could set a precedent for the wider industry.",
+    "A hearing is expected later this year. Legal experts said copyright cases of this "
+    "kind often take several years to resolve and are likely to end up on appeal.",
+])
+
+BANNER_PAGE = '\n\n'.join([
+    "We use cookies to improve your experience. Accept all cookies or manage cookie settings.",
+    "Sign up for our newsletter to get the latest stories in your inbox every morning.",
+    "Download the app for breaking news alerts. Follow us on social media.",
+    "Copyright 2024 Example News. All rights reserved. Terms of use. Privacy policy.",
+    "Short story text.",
+])
+
+
+def test_news_mentioning_copyright_passes():
+    assert check_content_quality('Authors sue over books', LAWSUIT_STORY, 'https://example.com/a') is None
+
+
+def test_page_of_banners_is_rejected():
+    result = check_content_quality('Example', BANNER_PAGE, 'https://example.com/b')
+    assert result['status'] == 'rejected'
+    assert 'Mostly boilerplate' in result['message']
+
+
+def _fail_fetch(url, headers, stop_markers=()):
+    raise ConnectionError('connection reset')
+
+
+def test_failed_fetch_is_rejected_in_every_engine(monkeypatch):
+    from unbiasedupdates import pipeline, utils
+
+    monkeypatch.setattr(utils, 'fetch_article_html', _fail_fetch)
+    monkeypatch.setattr(pipeline, 'fetch_article_html', _fail_fetch)
+
+    def article():
+        return {'link': 'https://www.bbc.co.uk/news/articles/x', 'title': 'X', 'index_checked': True}
+
+    threaded = utils.process_single_article_bbc(article(), 'openai', {}, object(), None)
+    [piped] = pipeline.process_articles_pipeline([article()], 'BBC', 'openai', {}, runnable=object())
+    for result in (threaded, piped):
+        assert result['status'] == 'rejected'
+        assert 'Error fetching content: connection reset' in result['message']
@@ -0,0 +1,105 @@
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from unbiasedupdates import llm, ratelimit
+from unbiasedupdates.ratelimit import configure_rate_limits, rate_limiters, set_invocation_deadline
+from unbiasedupdates.resilience import configure_circuit_breakers
+from unbiasedupdates.sessions import close_http_sessions, http_get
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def throttling_server():
+    """Answers 429 with Retry-After ?retry_after= to the first request, 200 afterwards"""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            requests_seen.append(time.monotonic())
+            if len(requests_seen) == 1:
+                self.send_response(429)
+                self.send_header('Retry-After', self.path.split('retry_after=')[1])
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = _Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    configure_rate_limits({'127.0.0.1': (100.0, 10)})
+    yield f'http://127.0.0.1:{server.server_port}/', requests_seen
+    server.shutdown()
+    close_http_sessions()
+    set_invocation_deadline(None)
+
+
+def test_short_retry_after_pauses_and_retries(throttling_server):
+    url, requests_seen = throttling_server
+    response = http_get(f'{url}?retry_after=0.3')
+    assert response.status_code == 200
+    assert len(requests_seen) == 2
+    assert requests_seen[1] - requests_seen[0] >= 0.25
+
+
+def test_long_retry_after_fails_without_pausing_the_host(throttling_server):
+    url, requests_seen = throttling_server
+    started = time.monotonic()
+    response = http_get(f'{url}?retry_after=3600')
+    assert response.status_code == 429
+    assert len(requests_seen) == 1
+    assert time.monotonic() - started < 1
+    # Other workers sharing the bucket are not stalled
+    assert rate_limiters._bucket('127.0.0.1').reserve() == 0
+
+
+def test_retry_after_past_invocation_deadline_is_not_waited_out(throttling_server):
+    url, requests_seen = throttling_server
+    set_invocation_deadline(5)
+    assert http_get(f'{url}?retry_after=30').status_code == 429
+    assert len(requests_seen) == 1
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__('Error code: 429')
+        self.response = type('Response', (), {'status_code': 429, 'headers': {'retry-after': retry_after}})()
+
+
+class Provider:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return 'summary'
+
+
+def test_llm_long_retry_after_fails_over_without_retrying(monkeypatch):
+    monkeypatch.setattr(llm, 'get_llm_cache', lambda: None)
+    configure_circuit_breakers()
+    configure_rate_limits({'openai': (100.0, 10), 'gemini': (100.0, 10)})
+    openai, gemini = Provider(RateLimited('3600')), Provider()
+    started = time.monotonic()
+    assert llm.invoke_with_failover([('openai', openai), ('gemini', gemini)], {'content': 'x'}) == ('summary', 'gemini')
+    assert openai.calls == 1
+    assert time.monotonic() - started < 1
+    assert rate_limiters._bucket('openai').reserve() == 0
+    configure_rate_limits({key: ratelimit.DEFAULT_RATE_LIMITS[key] for key in ('openai', 'gemini')})
+    configure_circuit_breakers()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from unbiasedupdates import llm
+from unbiasedupdates.resilience import CircuitBreaker, circuit_breakers, configure_circuit_breakers
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'Error code: {status_code}')
+        self.status_code = status_code
+
+
+class Provider:
+    """Raises the queued errors in turn, then returns a summary"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'summary'
+
+
+class HangingProvider:
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def ainvoke(self, inputs):
+        self.started.set()
+        await asyncio.sleep(3600)
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    monkeypatch.setattr(llm, 'get_llm_cache', lambda: None)
+    monkeypatch.setattr(llm, 'backoff_delay', lambda attempt: 0)
+    configure_circuit_breakers(failure_threshold=2, reset_timeout=0.05)
+    yield circuit_breakers
+    configure_circuit_breakers(failure_threshold=CircuitBreaker().failure_threshold,
+                               reset_timeout=CircuitBreaker().reset_timeout)
+
+
+def _open_half_open(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    _open_half_open(breaker)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened == 2
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_invalid_request_in_half_open_frees_the_trial_without_closing(breakers):
+    _open_half_open(breakers.get('openai'))
+    openai, gemini = Provider(ProviderError(400)), Provider()
+
+    assert llm.invoke_with_failover([('openai', openai), ('gemini', gemini)], {'content': 'x'}) == ('summary', 'gemini')
+    breaker = breakers.get('openai')
+    assert openai.calls == 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.failures == 2
+    # The next call gets the trial
+    assert breaker.allow()
+
+
+def test_invalid_request_does_not_reset_consecutive_failures(breakers):
+    openai = Provider(ProviderError(503), ProviderError(400))
+    with pytest.raises(ProviderError):
+        llm.invoke_with_failover([('openai', openai)], {'content': 'x'})
+    assert breakers.get('openai').failures == 1
+
+
+def test_cancelled_trial_is_released(breakers):
+    _open_half_open(breakers.get('openai'))
+    provider = HangingProvider()
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(llm.ainvoke_with_failover([('openai', provider)], {'content': 'x'}))
+        await provider.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    breaker = breakers.get('openai')
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,62 @@
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from unbiasedupdates.sessions import close_http_sessions, http_get_bounded
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def page_server():
+    """Local HTTP/1.1 server serving '<main>...</main>' followed by a tail of ?tail= bytes"""
+    connections = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            connections.add(self.client_address)
+            tail = int(self.path.split('tail=')[1])
+            body = b'<html><main>story</main>' + b'x' * tail + b'</html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionResetError:
+                pass
+
+    server = _Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/', connections
+    server.shutdown()
+    close_http_sessions()
+
+
+def test_small_tail_after_stop_marker_keeps_connection_alive(page_server):
+    url, connections = page_server
+    for _ in range(5):
+        body = http_get_bounded(f'{url}?tail=2000', stop_markers=(b'</main>',), drain_bytes=64 * 1024)
+        assert b'</main>' in body
+    assert len(connections) == 1
+
+
+def test_large_tail_after_stop_marker_is_cut_off(page_server):
+    url, connections = page_server
+    for _ in range(3):
+        body = http_get_bounded(f'{url}?tail=1000000', stop_markers=(b'</main>',),
+                                drain_bytes=64 * 1024, chunk_size=16 * 1024)
+        assert len(body) < 1000000
+    assert len(connections) == 3
@@ -0,0 +1,88 @@
+import time
+
+from unbiasedupdates import storage
+from unbiasedupdates.storage import ARTICLES_TABLE, URL_INDEX_TABLE, BatchItemWriter
+
+import pytest
+
+
+class FakeTable:
+    def __init__(self, dynamodb, name):
+        self.dynamodb = dynamodb
+        self.name = name
+
+    def put_item(self, Item):
+        if Item.get('bad'):
+            raise ValueError('ValidationException: Item size has exceeded the maximum allowed size')
+        self.dynamodb.stored[self.name].append(Item)
+
+
+class FakeDynamoDB:
+    """batch_write_item rejects the whole call if any item is bad, like DynamoDB's validation"""
+
+    def __init__(self):
+        self.stored = {ARTICLES_TABLE: [], URL_INDEX_TABLE: []}
+        self.batch_calls = 0
+
+    def Table(self, name):
+        return FakeTable(self, name)
+
+    def batch_write_item(self, RequestItems):
+        self.batch_calls += 1
+        for name, puts in RequestItems.items():
+            if any(put['PutRequest']['Item'].get('bad') for put in puts):
+                raise ValueError('ValidationException: Item size has exceeded the maximum allowed size')
+        for name, puts in RequestItems.items():
+            self.stored[name].extend(put['PutRequest']['Item'] for put in puts)
+        return {}
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.deadline = time.monotonic() + remaining_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    fake = FakeDynamoDB()
+    monkeypatch.setattr(storage, '_get_dynamodb_resource', lambda: fake)
+    return fake
+
+
+def _add(writer, i, **extra):
+    result = {'status': 'success', 'title': f'T{i}', 'message': 'ok'}
+    writer.add({'title': f'T{i}', **extra}, {'link': f'https://example.com/{i}'}, 'BBC', result)
+    return result
+
+
+def test_writes_in_batches_of_flush_size(dynamodb):
+    writer = BatchItemWriter(flush_size=3)
+    results = [_add(writer, i) for i in range(4)]
+    assert dynamodb.batch_calls == 2  # 3 articles + their index entries
+    assert [r['write_status'] for r in results] == ['written'] * 3 + ['pending']
+    writer.close()
+    assert results[3]['write_status'] == 'written'
+    assert len(dynamodb.stored[ARTICLES_TABLE]) == len(dynamodb.stored[URL_INDEX_TABLE]) == 4
+
+
+def test_bad_item_only_fails_itself(dynamodb):
+    with BatchItemWriter(flush_size=3) as writer:
+        results = [_add(writer, 0), _add(writer, 1, bad=True), _add(writer, 2)]
+    assert [r['status'] for r in results] == ['success', 'error', 'success']
+    assert [item['title'] for item in dynamodb.stored[ARTICLES_TABLE]] == ['T0', 'T2']
+    # No index entry for the article that wasn't stored
+    assert [item['title'] for item in dynamodb.stored[URL_INDEX_TABLE]] == ['T0', 'T2']
+
+
+def test_flushes_at_deadline_without_another_add(dynamodb):
+    writer = BatchItemWriter(context=FakeContext(remaining_ms=30200), deadline_margin_ms=30000)
+    result = _add(writer, 0)
+    assert result['write_status'] == 'pending'
+    time.sleep(0.5)
+    assert result['write_status'] == 'written'
+    # After the deadline every add is written straight away
+    assert _add(writer, 1)['write_status'] == 'written'
+    writer.close()
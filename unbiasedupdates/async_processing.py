@@ -0,0 +1,136 @@
+"""asyncio ingestion engine: an alternative to the ThreadPoolExecutor batch loop."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from unbiasedupdates.llm import ainvoke_with_failover, llm_candidates
+from unbiasedupdates.storage import BatchItemWriter
+from unbiasedupdates.utils import (
+    ARTICLE_SOURCES, _article_thumbnail, _check_content, _check_existing_title, _check_url_index,
+    _store_summary, print_result_progress
+)
+
+
+async def process_single_article_async(article: Dict[str, Any], source: str, model: str,
+                                       headers: Dict[str, str], runnable, grunnable,
+                                       semaphore: asyncio.Semaphore,
+                                       writer: Optional[BatchItemWriter] = None) -> Dict[str, Any]:
+    """
+    Async counterpart of `process_single_article_bbc` / `process_single_article_aj`.
+
+    Page fetch + parse and the DynamoDB calls are blocking libraries (requests, bs4,
+    boto3), so they run in the loop's executor; the LLM call uses the runnable's
+    native `ainvoke`, with retries and failover to the other model. The whole
+    article holds one slot of `semaphore`.
+
+    Returns:
+        Dictionary with processing result (same shape as the threaded processors)
+    """
+    url = article['link']
+    loop = asyncio.get_running_loop()
+
+    async with semaphore:
+        try:
+            # 0. Skip before fetching if the URL is already in the idempotency index
+            skipped = await loop.run_in_executor(None, _check_url_index, article)
+            if skipped:
+                return skipped
+
+            # 1. Extract article content; failed fetches and boilerplate never reach the LLM
+            title, content, main_image_url, _ = await loop.run_in_executor(
+                None, ARTICLE_SOURCES[source]['extractor'], url, headers
+            )
+            rejection = _check_content(article, source, title, content)
+            if rejection:
+                return rejection
+
+            # 2. Skip stored titles, or reuse the summary of a near-duplicate story
+            thumbnail = _article_thumbnail(article, source, main_image_url)
+            done = await loop.run_in_executor(
+                None, _check_existing_title, article, source, title, content, thumbnail, writer
+            )
+            if done:
+                return done
+
+            # 3. Generate summary using the selected model (retried, failing over to the other model)
+            if model not in ('openai', 'gemini'):
+                return {
+                    'status': 'error',
+                    'title': title,
+                    'url': url,
+                    'message': f'Unsupported model: {model}'
+                }
+            candidates = llm_candidates(model, runnable, grunnable)
+            llm_output, model_used = await ainvoke_with_failover(candidates, {'content': content})
+
+            # 4. Validate the output and insert into DynamoDB
+            return await loop.run_in_executor(
+                None, _store_summary, article, source, title, content, thumbnail, llm_output, model_used,
+                dict(candidates)[model_used], writer
+            )
+
+        except Exception as e:
+            return {
+                'status': 'error',
+                'title': article.get('title', 'Unknown'),
+                'url': url,
+                'message': str(e)
+            }
+
+
+async def _run_articles_async(articles: List[Dict[str, Any]], source: str, model: str,
+                              headers: Dict[str, str], runnable, grunnable,
+                              max_concurrency: int, io_workers: int,
+                              writer: Optional[BatchItemWriter]) -> List[Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=io_workers))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(article):
+        result = await process_single_article_async(
+            article, source, model, headers, runnable, grunnable, semaphore, writer
+        )
+        print_result_progress(result)
+        return result
+
+    return list(await asyncio.gather(*(run_one(article) for article in articles)))
+
+
+def process_articles_async(articles: List[Dict[str, Any]],
+                           source: str,
+                           model: str,
+                           headers: Dict[str, str],
+                           runnable=None,
+                           grunnable=None,
+                           max_concurrency: int = 50,
+                           io_workers: int = 32,
+                           writer: Optional[BatchItemWriter] = None) -> List[Dict[str, Any]]:
+    """
+    Process articles as coroutines under a single concurrency limit
+
+    Args:
+        articles: List of article dictionaries
+        source: Key into ARTICLE_SOURCES ('BBC' or 'AJ')
+        model: Model to use ('openai' or 'gemini')
+        headers: Headers for web requests
+        runnable: OpenAI runnable instance (required if model='openai')
+        grunnable: Gemini runnable instance (required if model='gemini')
+        max_concurrency: Maximum number of articles in flight at once
+        io_workers: Threads backing the blocking fetch/parse/DynamoDB calls
+        writer: Optional write-behind buffer for the DynamoDB writes (flushed by the caller)
+
+    Returns:
+        List of processing results, in the same order as `articles`
+    """
+    if model == 'openai' and runnable is None:
+        raise ValueError("runnable is required when model='openai'")
+    if model == 'gemini' and grunnable is None:
+        raise ValueError("grunnable is required when model='gemini'")
+    if source not in ARTICLE_SOURCES:
+        raise ValueError(f"Unknown source: {source}")
+
+    print(f"Processing {len(articles)} articles asynchronously (max {max_concurrency} in flight)")
+
+    return asyncio.run(_run_articles_async(
+        articles, source, model, headers, runnable, grunnable, max_concurrency, io_workers, writer
+    ))
@@ -0,0 +1,201 @@
+"""Process pool for article HTML extraction, so parsing scales across cores instead of contending for the GIL."""
+import atexit
+import multiprocessing
+import os
+import queue
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+# Lambda allocates CPU in proportion to memory: one full vCPU per 1,769 MB
+LAMBDA_MB_PER_VCPU = 1769
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs' worth of compute this process can actually use.
+
+    In Lambda the affinity mask shows the host's cores (2 or more) even when
+    the function only gets a fraction of one, so there the count comes from the
+    configured memory (memory / 1769 MB, rounded down, at least 1).
+    """
+    lambda_memory = os.environ.get('AWS_LAMBDA_FUNCTION_MEMORY_SIZE')
+    if lambda_memory:
+        try:
+            return max(1, int(lambda_memory) // LAMBDA_MB_PER_VCPU)
+        except ValueError:
+            pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _worker_main(conn):
+    """Worker loop: answer ('extract', source, html) and ('stats',) requests until told to stop"""
+    # Imported here: utils imports this module
+    from unbiasedupdates.extraction import selector_stats
+    from unbiasedupdates.utils import ARTICLE_SOURCES
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        try:
+            if message[0] == 'extract':
+                _, source, html = message
+                reply = ('ok', ARTICLE_SOURCES[source]['parser'](html))
+            elif message[0] == 'stats':
+                reply = ('ok', selector_stats())
+            else:
+                raise ValueError(f"Unknown request: {message[0]!r}")
+        except Exception as e:
+            reply = ('error', f"{type(e).__name__}: {e}")
+        conn.send(reply)
+
+
+class _Worker:
+    """One extraction process and the parent's end of its pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def call(self, message: Tuple, timeout: Optional[float]) -> Any:
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"Extraction worker did not answer within {timeout}s")
+        status, value = self.conn.recv()
+        if status == 'error':
+            raise RuntimeError(value)
+        return value
+
+    def stop(self, timeout: float = 1.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """
+    Fixed set of worker processes that turn raw article HTML into
+    (title, content, main_image_url, publication_date).
+
+    Network I/O stays in the calling threads; only the bytes go to a worker and
+    only the small result tuple comes back. Built on Process + Pipe rather than
+    multiprocessing.Pool / ProcessPoolExecutor, which need /dev/shm semaphores
+    that AWS Lambda does not provide. Safe to call from many threads: each call
+    borrows an idle worker and waits for one if all are busy.
+
+    Create the pool at cold start, before any worker threads exist, since
+    workers are forked from the current process where supported.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = 30.0):
+        """
+        Args:
+            workers: Number of processes (default: available_cpus())
+            timeout: Seconds to wait for a page before the worker is replaced
+        """
+        self.workers = workers or available_cpus()
+        self.timeout = timeout
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        self._all: List[_Worker] = []
+        self._idle: 'queue.Queue[_Worker]' = queue.Queue()
+        for _ in range(self.workers):
+            self._idle.put(self._start_worker())
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._context)
+        self._all.append(worker)
+        return worker
+
+    def _call(self, message: Tuple) -> Any:
+        worker = self._idle.get()
+        try:
+            return worker.call(message, self.timeout)
+        except (TimeoutError, EOFError, OSError):
+            # Hung or dead worker: replace it so the pool keeps its size
+            self._all.remove(worker)
+            worker.stop()
+            worker = self._start_worker()
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def extract(self, source: str, html: Union[bytes, str]) -> Tuple[str, str, str, str]:
+        """Run ARTICLE_SOURCES[source]['parser'] on `html` in a worker process"""
+        return tuple(self._call(('extract', source, html)))
+
+    def selector_stats(self) -> List[Dict[str, Dict[str, Any]]]:
+        """Each worker's selector_stats() (selector adaptation runs per process)"""
+        # Hold every worker so each one answers exactly once
+        workers = [self._idle.get() for _ in range(self.workers)]
+        try:
+            return [worker.call(('stats',), self.timeout) for worker in workers]
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def close(self):
+        """Stop every worker process"""
+        for worker in self._all:
+            worker.stop()
+        self._all = []
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def configure_extraction_pool(workers: Optional[int] = None, min_cpus: int = 2,
+                              timeout: Optional[float] = 30.0) -> Optional[ExtractionPool]:
+    """
+    Start the shared extraction pool used by `extract_article`.
+
+    With fewer than `min_cpus` available CPUs a pool would only add IPC overhead,
+    so none is started and parsing stays in the calling threads.
+
+    Args:
+        workers: Number of processes (default: one per available CPU)
+        min_cpus: Smallest CPU count worth starting processes for
+        timeout: Seconds to wait for a page before the worker is replaced
+
+    Returns:
+        The pool, or None if parsing stays in-thread
+    """
+    global _pool
+    close_extraction_pool()
+    cpus = available_cpus()
+    if workers is None and cpus < min_cpus:
+        print(f"Extraction pool disabled: {cpus} CPU(s) available")
+        return None
+    _pool = ExtractionPool(workers=workers or cpus, timeout=timeout)
+    print(f"Extraction pool started with {_pool.workers} processes")
+    return _pool
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Return the shared extraction pool, or None if parsing runs in-thread"""
+    return _pool
+
+
+def close_extraction_pool():
+    """Stop the shared extraction pool, if any"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+atexit.register(close_extraction_pool)
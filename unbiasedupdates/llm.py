@@ -0,0 +1,318 @@
+"""LLM execution helpers shared by every processing engine."""
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from unbiasedupdates.concurrency import ConcurrencyLimiter, llm_concurrency
+from unbiasedupdates.llm_cache import get_llm_cache, llm_cache_key
+from unbiasedupdates.ratelimit import parse_retry_after, rate_limiters, retry_after_allowed
+from unbiasedupdates.resilience import LLM_MAX_RETRIES, CircuitOpenError, backoff_delay, circuit_breakers
+
+
+def rate_limit_delay(error: Exception, default: float = 5.0) -> Optional[float]:
+    """
+    Return how long to back off if `error` is a provider rate-limit (429) error, else None.
+
+    Handles OpenAI (`status_code` / `response.headers`) and Google
+    (`code == 429`, RESOURCE_EXHAUSTED) style exceptions.
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    code = getattr(error, 'code', None)
+    text = str(error)
+    if not (status == 429 or code == 429 or 'RESOURCE_EXHAUSTED' in text
+            or 'Error code: 429' in text or 'rate limit' in text.lower()):
+        return None
+
+    headers = getattr(response, 'headers', None) or {}
+    return parse_retry_after(headers.get('retry-after'), default=default)
+
+
+def is_overload_error(error: Exception) -> bool:
+    """True if `error` is a provider rate-limit (429) or overload/unavailable (503) error"""
+    if rate_limit_delay(error) is not None:
+        return True
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    code = getattr(error, 'code', None)
+    text = str(error)
+    return (status == 503 or code == 503 or 'Error code: 503' in text
+            or 'UNAVAILABLE' in text or 'overloaded' in text.lower())
+
+
+# Client errors caused by the request itself (bad input, unknown model): the
+# same call would fail again, and the provider is healthy
+_NON_RETRYABLE_STATUSES = (400, 404, 422)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """False for errors caused by the request itself, True for everything else (429, 5xx, timeouts, ...)"""
+    if is_overload_error(error):
+        return True
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    code = getattr(error, 'code', None)
+    text = str(error)
+    return not (status in _NON_RETRYABLE_STATUSES or code in _NON_RETRYABLE_STATUSES
+                or any(f'Error code: {s}' in text for s in _NON_RETRYABLE_STATUSES)
+                or 'INVALID_ARGUMENT' in text)
+
+
+def _note_error(provider: str, error: Exception, limiter: Optional[ConcurrencyLimiter] = None,
+                started: Optional[float] = None):
+    delay = rate_limit_delay(error)
+    if delay is not None:
+        if retry_after_allowed(delay):
+            print(f"Rate limited by {provider}, pausing {delay:.1f}s")
+            rate_limiters.pause(provider, delay)
+        else:
+            print(f"Rate limited by {provider}, Retry-After {delay:.0f}s is too long to wait out")
+    if limiter is not None and is_overload_error(error):
+        limiter.record_overload(started)
+
+
+def invoke_llm(llm: Any, provider: str, inputs: Dict[str, Any]) -> Any:
+    """
+    Call `llm.invoke(inputs)` after taking a token from the provider's rate limiter.
+
+    When an LLM cache is configured (see llm_cache) a cached output for the same
+    input, prompt and model is returned without calling the provider, and new
+    string outputs are stored.
+
+    At most the provider's current concurrency limit (see concurrency) of calls
+    are in flight at once, across every thread and coroutine. Each call's
+    latency and any 429/503 feed back into that limit.
+
+    A 429 from the provider pauses its limiter for every worker before the
+    error is re-raised to the caller.
+    """
+    cache = get_llm_cache()
+    key = llm_cache_key(llm, provider, inputs) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    limiter = llm_concurrency.get(provider)
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        rate_limiters.acquire(provider)
+        started = time.monotonic()
+        try:
+            output = llm.invoke(inputs)
+        except Exception as e:
+            _note_error(provider, e, limiter, started)
+            raise
+        if limiter is not None:
+            limiter.record_success(started)
+    finally:
+        if limiter is not None:
+            limiter.release()
+
+    if cache is not None and isinstance(output, str) and output:
+        cache.put(key, output)
+    return output
+
+
+async def ainvoke_llm(llm: Any, provider: str, inputs: Dict[str, Any]) -> Any:
+    """Coroutine version of `invoke_llm` using the runnable's native `ainvoke`"""
+    loop = asyncio.get_running_loop()
+    cache = get_llm_cache()
+    key = llm_cache_key(llm, provider, inputs) if cache is not None else None
+    if cache is not None:
+        # Disk and DynamoDB tiers block, so keep them off the event loop
+        cached = await loop.run_in_executor(None, cache.get, key)
+        if cached is not None:
+            return cached
+
+    limiter = llm_concurrency.get(provider)
+    if limiter is not None:
+        await limiter.acquire_async()
+    try:
+        await rate_limiters.acquire_async(provider)
+        started = time.monotonic()
+        try:
+            output = await llm.ainvoke(inputs)
+        except Exception as e:
+            _note_error(provider, e, limiter, started)
+            raise
+        if limiter is not None:
+            limiter.record_success(started)
+    finally:
+        if limiter is not None:
+            limiter.release()
+
+    if cache is not None and isinstance(output, str) and output:
+        await loop.run_in_executor(None, cache.put, key, output)
+    return output
+
+
+def discard_cached_output(llm: Any, provider: str, inputs: Dict[str, Any]):
+    """Drop the cached output for this call, e.g. when it turned out to be unparseable"""
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.delete(llm_cache_key(llm, provider, inputs))
+
+
+def llm_candidates(model: str, runnable: Any, grunnable: Any) -> List[Tuple[str, Any]]:
+    """
+    (provider, runnable) pairs to try for `model`: the selected provider first,
+    then the other one (if given) as failover.
+    """
+    candidates = [('openai', runnable), ('gemini', grunnable)]
+    if model == 'gemini':
+        candidates.reverse()
+    return [(provider, llm) for provider, llm in candidates if llm is not None]
+
+
+def _wait_too_long(error: Exception) -> bool:
+    """True for a 429 whose Retry-After can't be waited out: fail over instead of retrying"""
+    delay = rate_limit_delay(error)
+    return delay is not None and not retry_after_allowed(delay)
+
+
+def _failover_error(provider: str, error: Optional[Exception]) -> Exception:
+    return error if error is not None else CircuitOpenError(f"Circuit breaker for {provider} is open")
+
+
+def invoke_with_failover(candidates: List[Tuple[str, Any]], inputs: Dict[str, Any],
+                         max_retries: int = LLM_MAX_RETRIES) -> Tuple[Any, str]:
+    """
+    Call the first provider in `candidates` through `invoke_llm`, retrying and failing over.
+
+    Transient errors (429s, 5xx, timeouts) are retried up to `max_retries`
+    times with jittered exponential backoff and count against the provider's
+    circuit breaker; a 429 asking for a longer pause than `retry_after_allowed`
+    permits fails over straight away. Once the retries are used up, or the breaker is open, the
+    next candidate is tried. Errors caused by the request itself are not
+    retried and don't count for or against the breaker, but still fail over,
+    since the other model may accept the input.
+
+    Args:
+        candidates: (provider, runnable) pairs in order of preference, e.g. from `llm_candidates`
+        inputs: Inputs for the runnable
+        max_retries: Retries per provider after its first attempt
+
+    Returns:
+        (output, provider that produced it)
+
+    Raises:
+        The last provider error, or CircuitOpenError if every breaker was open
+    """
+    last_error: Optional[Exception] = None
+    for position, (provider, llm) in enumerate(candidates):
+        breaker = circuit_breakers.get(provider)
+        for attempt in range(max_retries + 1):
+            if not breaker.allow():
+                last_error = _failover_error(provider, last_error)
+                break
+            try:
+                output = invoke_llm(llm, provider, inputs)
+            except Exception as e:
+                last_error = e
+                if not is_retryable_error(e):
+                    # Says nothing about the provider's health: neither closes
+                    # nor opens the breaker, but frees a half-open trial
+                    breaker.release_trial()
+                    break
+                breaker.record_failure()
+                if _wait_too_long(e):
+                    break
+                if attempt < max_retries:
+                    delay = backoff_delay(attempt)
+                    print(f"{provider} call failed ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted: don't leave a half-open trial claimed forever
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return output, provider
+        if position + 1 < len(candidates):
+            print(f"Failing over from {provider} to {candidates[position + 1][0]}: {last_error}")
+    raise _failover_error(candidates[-1][0] if candidates else 'LLM', last_error)
+
+
+async def ainvoke_with_failover(candidates: List[Tuple[str, Any]], inputs: Dict[str, Any],
+                                max_retries: int = LLM_MAX_RETRIES) -> Tuple[Any, str]:
+    """Coroutine version of `invoke_with_failover` (backoff sleeps don't block the event loop)"""
+    last_error: Optional[Exception] = None
+    for position, (provider, llm) in enumerate(candidates):
+        breaker = circuit_breakers.get(provider)
+        for attempt in range(max_retries + 1):
+            if not breaker.allow():
+                last_error = _failover_error(provider, last_error)
+                break
+            try:
+                output = await ainvoke_llm(llm, provider, inputs)
+            except Exception as e:
+                last_error = e
+                if not is_retryable_error(e):
+                    # Says nothing about the provider's health: neither closes
+                    # nor opens the breaker, but frees a half-open trial
+                    breaker.release_trial()
+                    break
+                breaker.record_failure()
+                if _wait_too_long(e):
+                    break
+                if attempt < max_retries:
+                    delay = backoff_delay(attempt)
+                    print(f"{provider} call failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or interrupted: don't leave a half-open trial claimed forever
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return output, provider
+        if position + 1 < len(candidates):
+            print(f"Failing over from {provider} to {candidates[position + 1][0]}: {last_error}")
+    raise _failover_error(candidates[-1][0] if candidates else 'LLM', last_error)
+
+
+class AsyncLLMExecutor:
+    """
+    Runs `ainvoke_with_failover` calls on a private event loop in a background thread.
+
+    Synchronous code submits calls and keeps working; each call waits for its
+    provider's concurrency slot and rate-limit token on the loop, so many calls
+    can be in flight without a thread per call.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='llm-executor', daemon=True)
+        self._thread.start()
+
+    def submit_with_failover(self, candidates: List[Tuple[str, Any]], inputs: Dict[str, Any]) -> Future:
+        """Start one `ainvoke_with_failover` call; the future resolves to (output, provider)"""
+        return asyncio.run_coroutine_threadsafe(ainvoke_with_failover(candidates, inputs), self._loop)
+
+    def close(self):
+        """Stop the event loop (calls still in flight are abandoned)"""
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
+
+
+_executor: Optional[AsyncLLMExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> AsyncLLMExecutor:
+    """Return the shared LLM executor, starting it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = AsyncLLMExecutor()
+                atexit.register(_executor.close)
+    return _executor
+
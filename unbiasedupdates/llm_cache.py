@@ -0,0 +1,330 @@
+"""Content-addressed cache of raw LLM outputs, keyed by (normalized input, prompt template, model)."""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from unbiasedupdates.storage import _get_dynamodb_resource
+
+LLM_CACHE_TABLE = os.environ.get('LLM_CACHE_TABLE', 'news_llm_cache')
+LLM_CACHE_DIR = os.environ.get('LLM_CACHE_DIR', '/tmp/llm_cache')
+DEFAULT_TTL = float(os.environ.get('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# id(runnable) -> (runnable, fingerprint); the runnable is kept so its id stays unique
+_fingerprints: Dict[int, tuple] = {}
+_fingerprints_lock = threading.Lock()
+
+
+def _runnable_spec(runnable: Any) -> Any:
+    """
+    JSON-able description of what a runnable does, built only from stable
+    fields: prompt template text, model type and name, and generation
+    parameters. LangChain's own `to_json` can't be used for this: for models
+    it falls back to a repr containing the API client objects' memory
+    addresses, which differ in every process.
+    """
+    steps = getattr(runnable, 'steps', None)
+    if steps is not None:
+        # RunnableSequence, e.g. prompt | llm | parser
+        return [_runnable_spec(step) for step in steps]
+    bound = getattr(runnable, 'bound', None)
+    if bound is not None:
+        # RunnableBinding, e.g. with_structured_output() or bind(...)
+        return {'bound': _runnable_spec(bound), 'kwargs': getattr(runnable, 'kwargs', {})}
+    if hasattr(runnable, '_llm_type') and hasattr(runnable, '_identifying_params'):
+        # Chat model: provider type, model name and generation parameters
+        return {'llm_type': runnable._llm_type, 'params': runnable._identifying_params}
+    messages = getattr(runnable, 'messages', None)
+    if messages is not None:
+        # Chat prompt: every message's role and template text
+        return [{'type': type(message).__name__,
+                 'template': getattr(getattr(message, 'prompt', None), 'template', None)
+                 or getattr(message, 'content', None)}
+                for message in messages]
+    if isinstance(getattr(runnable, 'template', None), str):
+        return {'template': runnable.template}
+    # Output parsers and other stateless steps
+    return f"{type(runnable).__module__}.{type(runnable).__qualname__}"
+
+
+def llm_fingerprint(llm: Any) -> str:
+    """
+    Stable hash of a runnable's configuration: prompt template, model name and
+    model parameters. The same runnable built in another process or container
+    has the same fingerprint, so the disk and DynamoDB tiers can hit.
+    """
+    cached = _fingerprints.get(id(llm))
+    if cached is not None and cached[0] is llm:
+        return cached[1]
+
+    spec = json.dumps(_runnable_spec(llm), sort_keys=True, default=str)
+    fingerprint = hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[id(llm)] = (llm, fingerprint)
+    return fingerprint
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub(' ', value).strip()
+    return value
+
+
+def llm_cache_key(llm: Any, provider: str, inputs: Dict[str, Any]) -> str:
+    """Cache key for calling `llm` with `inputs` (whitespace differences in text inputs are ignored)"""
+    normalized = {name: _normalize(value) for name, value in inputs.items()}
+    payload = json.dumps({'provider': provider, 'llm': llm_fingerprint(llm), 'inputs': normalized},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryLRUCache:
+    """In-process LRU: lives as long as the Lambda container, shared by all threads"""
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DiskCache:
+    """
+    One JSON file per entry under `directory` (Lambda's /tmp survives warm starts).
+
+    When the directory grows past `max_bytes` the least recently written
+    entries are removed.
+    """
+
+    def __init__(self, directory: str = LLM_CACHE_DIR, max_bytes: int = 100 * 1024 * 1024,
+                 ttl: Optional[float] = DEFAULT_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at') is not None and entry['expires_at'] <= time.time():
+            self.delete(key)
+            return None
+        return entry['value']
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        data = json.dumps({'value': value, 'expires_at': expires_at}).encode('utf-8')
+        path = self._path(key)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            try:
+                size = os.path.getsize(self._path(key))
+                os.remove(self._path(key))
+                self._size -= size
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Oldest first, down to 90% of the limit so eviction doesn't run on every put
+        entries = sorted((entry for entry in os.scandir(self.directory)
+                          if entry.is_file() and entry.name.endswith('.json')),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except OSError:
+                pass
+
+
+class DynamoDBCache:
+    """
+    Entries in a DynamoDB table keyed by `cache_key`, shared by every container.
+
+    Expiry uses the table's TTL attribute `expires_at`. DynamoDB deletes expired
+    items lazily, so reads also check it. Size is bounded by TTL alone.
+    """
+
+    def __init__(self, table_name: str = LLM_CACHE_TABLE, ttl: Optional[float] = DEFAULT_TTL):
+        self.table_name = table_name
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _table(self):
+        if not hasattr(self._local, 'table'):
+            self._local.table = _get_dynamodb_resource().Table(self.table_name)
+        return self._local.table
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._table().get_item(Key={'cache_key': key}).get('Item')
+        if item is None:
+            return None
+        if 'expires_at' in item and int(item['expires_at']) <= time.time():
+            return None
+        return item['output']
+
+    def put(self, key: str, value: str):
+        item = {'cache_key': key, 'output': value}
+        if self.ttl:
+            item['expires_at'] = Decimal(int(time.time() + self.ttl))
+        self._table().put_item(Item=item)
+
+    def delete(self, key: str):
+        self._table().delete_item(Key={'cache_key': key})
+
+
+class TieredCache:
+    """
+    Looks up each tier in order (fastest first) and copies a hit into the faster
+    tiers. Writes go to every tier. A failing tier is logged and skipped, so the
+    cache never fails an LLM call.
+    """
+
+    def __init__(self, tiers: List[Any]):
+        self.tiers = tiers
+        self._stats_lock = threading.Lock()
+        self.hits = [0] * len(tiers)
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        for level, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                print(f"LLM cache {type(tier).__name__} read failed: {e}")
+                continue
+            if value is not None:
+                with self._stats_lock:
+                    self.hits[level] += 1
+                for upper in self.tiers[:level]:
+                    try:
+                        upper.put(key, value)
+                    except Exception as e:
+                        print(f"LLM cache {type(upper).__name__} write failed: {e}")
+                return value
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str):
+        for tier in self.tiers:
+            try:
+                tier.put(key, value)
+            except Exception as e:
+                print(f"LLM cache {type(tier).__name__} write failed: {e}")
+
+    def delete(self, key: str):
+        for tier in self.tiers:
+            try:
+                tier.delete(key)
+            except Exception as e:
+                print(f"LLM cache {type(tier).__name__} delete failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hits per tier and total misses"""
+        with self._stats_lock:
+            stats = {f"{type(tier).__name__}_hits": hits for tier, hits in zip(self.tiers, self.hits)}
+            stats['misses'] = self.misses
+            return stats
+
+
+def build_llm_cache(memory_entries: int = 512,
+                    disk_dir: Optional[str] = LLM_CACHE_DIR,
+                    disk_max_bytes: int = 100 * 1024 * 1024,
+                    table_name: Optional[str] = None,
+                    ttl: Optional[float] = DEFAULT_TTL) -> TieredCache:
+    """
+    Build the usual memory -> /tmp -> DynamoDB cache. Pass None/0 to leave a tier out.
+
+    Args:
+        memory_entries: LRU capacity (0 disables the memory tier)
+        disk_dir: Directory for the disk tier (None disables it)
+        disk_max_bytes: Disk tier size limit
+        table_name: DynamoDB table for the shared tier (None disables it)
+        ttl: Seconds an entry stays valid in every tier
+    """
+    tiers = []
+    if memory_entries:
+        tiers.append(MemoryLRUCache(max_entries=memory_entries, ttl=ttl))
+    if disk_dir:
+        tiers.append(DiskCache(directory=disk_dir, max_bytes=disk_max_bytes, ttl=ttl))
+    if table_name:
+        tiers.append(DynamoDBCache(table_name=table_name, ttl=ttl))
+    return TieredCache(tiers)
+
+
+_cache: Optional[Any] = None
+
+
+def configure_llm_cache(cache: Optional[Any]):
+    """
+    Set the cache `invoke_llm` consults before every call (None disables caching).
+
+    Any object with get(key), put(key, value) and delete(key) works, e.g. one
+    built with `build_llm_cache`.
+    """
+    global _cache
+    _cache = cache
+
+
+def get_llm_cache() -> Optional[Any]:
+    """Return the configured LLM cache, or None"""
+    return _cache
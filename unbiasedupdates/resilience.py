@@ -0,0 +1,147 @@
+"""Jittered exponential backoff and per-provider circuit breakers for LLM calls."""
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+# Retries per provider after the first attempt, before failing over
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))
+# Consecutive failures that open a provider's breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('LLM_BREAKER_FAILURES', '5'))
+BREAKER_RESET_SECONDS = float(os.environ.get('LLM_BREAKER_RESET_SECONDS', '60'))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based): "full jitter",
+    uniform between 0 and base * 2**attempt (at most `cap`), so workers that
+    failed together don't all retry together.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every provider that could serve a call has an open breaker"""
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a provider that keeps failing.
+
+    Closed: calls pass; `failure_threshold` consecutive failures open it.
+    Open: calls are refused for `reset_timeout` seconds.
+    Half-open: one trial call is let through; its success closes the breaker,
+    its failure opens it again for another `reset_timeout`. A trial that ends
+    without telling either way (e.g. the request itself was invalid, or it was
+    cancelled) is handed back with `release_trial`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_SECONDS):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (in half-open state, claims the single trial call)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._state = self.CLOSED
+
+    def release_trial(self):
+        """Give back a claimed trial call without recording an outcome; the state is unchanged"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """One breaker per provider, created on first use with the registry's settings."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        """Change the settings (None keeps the current value) and reset every breaker"""
+        with self._lock:
+            if failure_threshold is not None:
+                self.failure_threshold = failure_threshold
+            if reset_timeout is not None:
+                self.reset_timeout = reset_timeout
+            self._breakers.clear()
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """State, consecutive failures and times opened per provider"""
+        return {key: {'state': breaker.state, 'failures': breaker.failures, 'opened': breaker.opened}
+                for key, breaker in self._breakers.items()}
+
+
+# Shared by every engine in the process
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def configure_circuit_breakers(failure_threshold: Optional[int] = None,
+                               reset_timeout: Optional[float] = None):
+    """
+    Change the breaker settings and reset every provider's breaker.
+
+    Args:
+        failure_threshold: Consecutive failures that open a breaker (None keeps the current value)
+        reset_timeout: Seconds a breaker stays open before a trial call (None keeps the current value)
+    """
+    circuit_breakers.configure(failure_threshold, reset_timeout)
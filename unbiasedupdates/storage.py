@@ -0,0 +1,405 @@
+"""DynamoDB access: the title-keyed articles table and the URL-keyed idempotency index."""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import boto3
+
+from unbiasedupdates.urls import canonicalize_url, url_key
+
+ARTICLES_TABLE = 'news_articles'
+# Idempotency index: one item per article URL, checked before any page fetch.
+URL_INDEX_TABLE = os.environ.get('URL_INDEX_TABLE', 'news_articles_url_index')
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+
+# Thread-local storage for AWS resources
+thread_local = threading.local()
+
+
+def _get_dynamodb_resource():
+    """Return a per-thread DynamoDB resource using local profile only if not running inside AWS Lambda"""
+    if not hasattr(thread_local, 'dynamodb'):
+        # Auto-detect if running in Lambda environment
+        running_in_lambda = 'AWS_LAMBDA_FUNCTION_NAME' in os.environ
+
+        if running_in_lambda:
+            # Use IAM role in Lambda
+            session = boto3.Session(region_name='us-east-1')
+        else:
+            # Local development (assumes profile is configured)
+            session = boto3.Session(profile_name='root-access', region_name='us-east-1')
+
+        thread_local.dynamodb = session.resource('dynamodb')
+
+    return thread_local.dynamodb
+
+
+def get_aws_resources():
+    """Return DynamoDB table using local profile only if not running inside AWS Lambda"""
+    if not hasattr(thread_local, 'table'):
+        thread_local.table = _get_dynamodb_resource().Table(ARTICLES_TABLE)
+
+    return thread_local.table
+
+
+def get_url_index_table():
+    """Return the URL-keyed idempotency index table for the current thread"""
+    if not hasattr(thread_local, 'url_index_table'):
+        thread_local.url_index_table = _get_dynamodb_resource().Table(URL_INDEX_TABLE)
+
+    return thread_local.url_index_table
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Return the URL index key for a feed article: the stable hash of its canonical URL"""
+    return url_key(article.get('canonical_url') or article['link'])
+
+
+def is_article_indexed(article: Dict[str, Any]) -> bool:
+    """Return True if the article's URL is already in the idempotency index"""
+    response = get_url_index_table().get_item(
+        Key={'url_key': article_key(article)},
+        ProjectionExpression='url_key'
+    )
+    return 'Item' in response
+
+
+def get_indexed_keys(keys: Iterable[str], max_retries: int = 5) -> Set[str]:
+    """
+    Resolve which URL keys are already in the idempotency index, 100 keys per BatchGetItem call.
+
+    Keys DynamoDB returns as unprocessed (throttling) are retried with exponential backoff.
+
+    Args:
+        keys: URL index keys to look up (duplicates are ignored)
+        max_retries: Retries per chunk before giving up on its unprocessed keys
+
+    Returns:
+        Set of keys that exist in the index
+
+    Raises:
+        RuntimeError: If some keys are still unprocessed after `max_retries` retries
+    """
+    dynamodb = _get_dynamodb_resource()
+    unique_keys = list(dict.fromkeys(keys))
+    found = set()
+
+    for i in range(0, len(unique_keys), BATCH_GET_LIMIT):
+        chunk = unique_keys[i:i + BATCH_GET_LIMIT]
+        request = {URL_INDEX_TABLE: {
+            'Keys': [{'url_key': key} for key in chunk],
+            'ProjectionExpression': 'url_key',
+        }}
+        attempt = 0
+
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            found.update(item['url_key'] for item in response['Responses'].get(URL_INDEX_TABLE, []))
+
+            request = response.get('UnprocessedKeys') or {}
+            if request:
+                attempt += 1
+                if attempt > max_retries:
+                    raise RuntimeError(
+                        f"{len(request[URL_INDEX_TABLE]['Keys'])} keys still unprocessed after {max_retries} retries"
+                    )
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+    return found
+
+
+def filter_new_articles(articles: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Drop articles whose URL is already indexed, using bulk lookups, before any worker is scheduled.
+
+    Articles that pass are flagged with `index_checked` so the processors skip their
+    own per-article lookup. If the bulk lookup fails, every article is returned
+    unflagged and the processors fall back to checking one by one.
+
+    Returns:
+        tuple: (new_articles, skipped_results) where skipped_results use the usual result dict shape
+    """
+    try:
+        indexed = get_indexed_keys(article_key(article) for article in articles)
+    except Exception as e:
+        print(f"Bulk URL index lookup failed, falling back to per-article checks: {e}")
+        return articles, []
+
+    new_articles = []
+    skipped_results = []
+    for article in articles:
+        if article_key(article) in indexed:
+            skipped_results.append({
+                'status': 'skipped',
+                'title': article.get('title', 'Unknown'),
+                'url': article['link'],
+                'message': 'Article already exists (URL index)'
+            })
+        else:
+            article['index_checked'] = True
+            new_articles.append(article)
+
+    print(f"URL index: {len(skipped_results)} already stored, {len(new_articles)} to process")
+    return new_articles, skipped_results
+
+
+def _url_index_item(article: Dict[str, Any], title: str, source: str) -> Dict[str, Any]:
+    return {
+        'url_key': article_key(article),
+        'url': article.get('link'),
+        'canonical_url': article.get('canonical_url') or canonicalize_url(article['link']),
+        'title': title,
+        'source': source,
+        'indexed_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def mark_article_indexed(article: Dict[str, Any], title: str, source: str):
+    """Record the article's URL in the idempotency index, pointing at its `news_articles` title"""
+    get_url_index_table().put_item(Item=_url_index_item(article, title, source))
+
+
+class BatchItemWriter:
+    """
+    Thread-safe write-behind buffer for summarized articles.
+
+    Each `add` queues an article item together with its URL index entry;
+    whenever 25 articles (the BatchWriteItem limit) are pending they are
+    written in one call. Unprocessed items are retried with exponential
+    backoff. Index entries are written afterwards, and only for articles whose
+    put succeeded, so a failed write never leaves an index entry that would
+    make later runs skip the article. The outcome of every write is reported
+    back into the article's result dict: `write_status` becomes 'written', or
+    the result is turned into an error. If a batch call itself fails (e.g. one
+    item over the 400 KB limit fails validation), its items are retried one
+    `put_item` at a time so only the bad item is lost.
+
+    The buffer is flushed on `close()` (or leaving a `with` block). When a
+    Lambda `context` is given, a timer also flushes it once the remaining time
+    drops below `deadline_margin_ms`, even if no further `add` arrives (e.g.
+    while the last LLM calls are still running), and every later `add` is
+    written immediately.
+    """
+
+    def __init__(self, flush_size: int = 25, max_retries: int = 5,
+                 context: Any = None, deadline_margin_ms: int = 30000):
+        if not 1 <= flush_size <= 25:
+            raise ValueError("flush_size must be between 1 and 25")
+        self.flush_size = flush_size
+        self.max_retries = max_retries
+        self.context = context
+        self.deadline_margin_ms = deadline_margin_ms
+        # (article item, URL index item, result)
+        self._pending: List[Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._timer = None
+        if context is not None:
+            delay = (context.get_remaining_time_in_millis() - deadline_margin_ms) / 1000
+            self._timer = threading.Timer(max(0.0, delay), self._flush_at_deadline)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _deadline_near(self) -> bool:
+        return (self.context is not None and
+                self.context.get_remaining_time_in_millis() < self.deadline_margin_ms)
+
+    def add(self, item: Dict[str, Any], article: Dict[str, Any], source: str,
+            result: Optional[Dict[str, Any]] = None):
+        """
+        Queue an article item and its URL index entry for writing.
+
+        Args:
+            item: `news_articles` item
+            article: Feed article the item was built from (for the URL index entry)
+            source: Source label stored in the index
+            result: Result dict to update with the write outcome
+        """
+        if result is not None:
+            result['write_status'] = 'pending'
+
+        with self._lock:
+            self._pending.append((item, _url_index_item(article, item['title'], source), result))
+            ready = len(self._pending) >= self.flush_size or self._deadline_near()
+            batch = self._take(len(self._pending) if ready else 0)
+
+        if batch:
+            self._write(batch)
+
+    def flush(self):
+        """Write everything that is still buffered"""
+        while True:
+            with self._lock:
+                batch = self._take(self.flush_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self.flush()
+
+    def _flush_at_deadline(self):
+        with self._lock:
+            pending = len(self._pending)
+        if pending:
+            print(f"Lambda deadline near: flushing {pending} buffered articles")
+        self.flush()
+
+    def _take(self, count: int):
+        batch, self._pending = self._pending[:count], self._pending[count:]
+        return batch
+
+    def _write(self, batch):
+        for i in range(0, len(batch), self.flush_size):
+            self._write_chunk(batch[i:i + self.flush_size])
+
+    def _put_all(self, table_name: str, key_name: str,
+                 items: List[Dict[str, Any]]) -> Tuple[set, Optional[str]]:
+        """
+        BatchWriteItem `items` into one table, retrying unprocessed items.
+
+        Returns:
+            (keys of the items that were not written, error message or None)
+        """
+        request = {table_name: [{'PutRequest': {'Item': item}} for item in items]}
+        dynamodb = _get_dynamodb_resource()
+        attempt = 0
+        error = None
+        while request:
+            try:
+                response = dynamodb.batch_write_item(RequestItems=request)
+            except Exception as e:
+                # The whole call was rejected, possibly for a single bad item
+                return self._put_each(dynamodb.Table(table_name), key_name,
+                                      [put['PutRequest']['Item'] for put in request[table_name]], str(e))
+            request = response.get('UnprocessedItems') or {}
+            if request:
+                attempt += 1
+                if attempt > self.max_retries:
+                    error = f'Unprocessed after {self.max_retries} retries'
+                    break
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+        failed_keys = {put['PutRequest']['Item'][key_name] for put in request.get(table_name, [])}
+        return failed_keys, error
+
+    @staticmethod
+    def _put_each(table: Any, key_name: str, items: List[Dict[str, Any]],
+                  batch_error: str) -> Tuple[set, Optional[str]]:
+        """Write `items` one `put_item` at a time after a failed batch call"""
+        failed_keys = set()
+        errors = []
+        for item in items:
+            try:
+                table.put_item(Item=item)
+            except Exception as e:
+                failed_keys.add(item[key_name])
+                errors.append(str(e))
+        if not failed_keys:
+            return failed_keys, None
+        print(f"Batch write failed ({batch_error}); {len(failed_keys)} of {len(items)} items also failed individually")
+        return failed_keys, errors[-1]
+
+    def _write_chunk(self, chunk):
+        # BatchWriteItem rejects two requests for the same key in one call;
+        # like consecutive put_item calls, the last write for a key wins.
+        articles: Dict[Any, Dict[str, Any]] = {}
+        results_by_title: Dict[Any, List[Dict[str, Any]]] = {}
+        for item, _, result in chunk:
+            articles[item['title']] = item
+            if result is not None:
+                results_by_title.setdefault(item['title'], []).append(result)
+
+        # 1. The articles themselves
+        failed_titles, error = self._put_all(ARTICLES_TABLE, 'title', list(articles.values()))
+        for title, results in results_by_title.items():
+            for result in results:
+                if title in failed_titles:
+                    result['status'] = 'error'
+                    result['write_status'] = 'failed'
+                    result['message'] = f'DynamoDB batch write failed: {error}'
+                    print(f"✗ Write failed: {result['title']} - {error}")
+                else:
+                    result['write_status'] = 'written'
+
+        # 2. URL index entries, only for articles that are now stored. A missing
+        # entry only costs a refetch next run (the title check still skips it).
+        index_items = {index_item['url_key']: index_item for item, index_item, _ in chunk
+                       if item['title'] not in failed_titles}
+        if not index_items:
+            return
+        failed_urls, error = self._put_all(URL_INDEX_TABLE, 'url_key', list(index_items.values()))
+        if failed_urls:
+            print(f"URL index write failed for {len(failed_urls)} stored articles: {error}")
+
+
+def save_article_item(item: Dict[str, Any], article: Dict[str, Any], source: str,
+                      result: Dict[str, Any], writer: Optional[BatchItemWriter] = None):
+    """
+    Store a summarized article and record its URL in the index.
+
+    With a `writer` the item is buffered and `result` is updated when it is
+    written; without one both writes happen immediately.
+    """
+    if writer is not None:
+        writer.add(item, article, source, result)
+        return
+
+    get_aws_resources().put_item(Item=item)
+    mark_article_indexed(article, item['title'], source)
+
+
+def backfill_url_index(limit: Optional[int] = None) -> int:
+    """
+    Migration helper: copy every stored article's URL from `news_articles` into the index.
+
+    Articles stored before the index existed are otherwise only caught by the
+    (post-fetch) title check, which also adds them to the index as it finds them,
+    so running this once is optional but saves one fetch per old article.
+
+    Args:
+        limit: Stop after this many items (None for the whole table)
+
+    Returns:
+        Number of index entries written
+    """
+    table = get_aws_resources()
+    scan_kwargs = {'ProjectionExpression': '#t, #u, #s',
+                   'ExpressionAttributeNames': {'#t': 'title', '#u': 'url', '#s': 'source'}}
+    written = 0
+
+    with get_url_index_table().batch_writer(overwrite_by_pkeys=['url_key']) as batch:
+        while limit is None or written < limit:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                if not item.get('url'):
+                    continue
+                batch.put_item(Item={
+                    'url_key': article_key({'link': item['url']}),
+                    'url': item['url'],
+                    'canonical_url': canonicalize_url(item['url']),
+                    'title': item['title'],
+                    'source': item.get('source', 'Unknown'),
+                    'indexed_at': datetime.now(timezone.utc).isoformat(),
+                })
+                written += 1
+                if limit is not None and written >= limit:
+                    break
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print(f"Backfilled {written} URL index entries")
+    return written